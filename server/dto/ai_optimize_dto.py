@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 
 class PromptRequest(BaseModel):
@@ -50,3 +50,21 @@ class HealthResponse(BaseModel):
     models_loaded: bool = Field(...,
                                 description="Whether ML models are loaded")
     version: str = Field(..., description="API version")
+
+
+class ModelLoadStatus(BaseModel):
+    """Load progress of one model."""
+    status: str = Field(..., description="loading, ready or failed")
+    load_time_s: Optional[float] = Field(
+        None, description="Seconds the model took to load")
+
+
+class ReadinessResponse(BaseModel):
+    """Readiness probe response model."""
+    status: str = Field(...,
+                        description="not_started, loading, ready or failed")
+    models: Dict[str, ModelLoadStatus] = Field(
+        ..., description="Per-model load progress")
+    elapsed_s: Optional[float] = Field(
+        None, description="Seconds spent loading so far (or in total)")
+    error: Optional[str] = Field(None, description="Load error, if any")
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from typing import Dict, List, Optional, Union
+from pydantic import BaseModel, Field
 
 
 class PromptEnergyResponse(BaseModel):
@@ -8,3 +9,28 @@ class PromptEnergyResponse(BaseModel):
     energy_wh: float
     energy_mwh: float
     co2_grams: float
+    region: str
+    registry_version: str
+
+
+class BulkEnergyRequest(BaseModel):
+    """Many prompts as columns: token counts or texts, plus model and region."""
+    token_counts: Optional[List[int]] = Field(None, max_length=1000000)
+    texts: Optional[List[str]] = Field(None, max_length=100000)
+    model_name: Union[str, List[str]] = "gpt-4"
+    region: Optional[Union[str, List[str]]] = None
+    include_rows: bool = False
+
+
+class BulkEnergyResponse(BaseModel):
+    """Columnar estimates; `rows` is only filled when requested."""
+    registry_version: str
+    count: int
+    tokens: List[int]
+    model: List[str]
+    region: List[str]
+    energy_wh: List[float]
+    energy_mwh: List[float]
+    co2_grams: List[float]
+    totals: Dict[str, float]
+    rows: Optional[List[PromptEnergyResponse]] = None
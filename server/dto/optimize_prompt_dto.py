@@ -1,9 +1,12 @@
-from pydantic import BaseModel
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel, Field
 
 
 class PromptRequest(BaseModel):
     text: str
     model_name: str
+    # Grid region for the carbon intensity (default: the registry's default)
+    region: Optional[str] = None
 
 
 class PromptResponse(BaseModel):
@@ -26,3 +29,91 @@ class EnergySavedResponse(PromptResponse):
     co2emission_balanced: float
     co2emission_aggresive: float
     co2emission_conservative: float
+    region: str
+    registry_version: str
+
+
+class LivePromptRevision(BaseModel):
+    text: str = Field(..., max_length=100000)
+    model_name: str = "gpt-4"
+    region: Optional[str] = None
+    # Client side counter; assigned by the server when omitted
+    revision: Optional[int] = None
+
+
+class BatchPromptRequest(BaseModel):
+    prompts: List[PromptRequest] = Field(..., min_length=1, max_length=10000)
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    result: Optional[EnergySavedResponse] = None
+    error: Optional[str] = None
+
+
+class BatchEnergySavedResponse(BaseModel):
+    results: List[BatchItemResult]
+    succeeded: int
+    failed: int
+    total_original_energy: float
+    total_energy_saved_balanced: float
+    total_energy_saved_aggressive: float
+    total_energy_saved_conservative: float
+    total_co2emission_original: float
+    total_co2emission_balanced: float
+    total_co2emission_aggresive: float
+    total_co2emission_conservative: float
+
+
+# v2: typed diagnostics instead of str() of Python objects, and only the
+# requested fields are computed and serialized.
+Variant = Literal["conservative", "balanced", "aggressive"]
+AnalysisField = Literal[
+    "conservative", "balanced", "aggressive", "energy", "removed_clauses",
+    "text_after_clause_removal", "pos_analysis", "stopwords_found",
+    "important_words"]
+ALL_ANALYSIS_FIELDS = list(AnalysisField.__args__)
+
+
+class PromptRequestV2(PromptRequest):
+    # None returns every field, like v1
+    fields: Optional[List[AnalysisField]] = Field(
+        None, description="Fields to compute; omitted fields are skipped")
+
+
+class TaggedWord(BaseModel):
+    word: str
+    pos: str
+
+
+class StopwordFinding(TaggedWord):
+    reason: Literal["stopword", "filterable_pos"]
+
+
+class VariantResult(BaseModel):
+    text: str
+    # Energy figures are only present when "energy" is requested
+    tokens: Optional[int] = None
+    energy_mwh: Optional[float] = None
+    energy_saved_mwh: Optional[float] = None
+    co2_grams: Optional[float] = None
+
+
+class OriginalEnergy(BaseModel):
+    tokens: int
+    energy_mwh: float
+    co2_grams: float
+
+
+class PromptAnalysisResponseV2(BaseModel):
+    original: str
+    model_name: str
+    region: Optional[str] = None
+    registry_version: Optional[str] = None
+    original_energy: Optional[OriginalEnergy] = None
+    variants: Dict[Variant, VariantResult] = {}
+    removed_clauses: Optional[List[str]] = None
+    text_after_clause_removal: Optional[str] = None
+    pos_analysis: Optional[Dict[str, List[str]]] = None
+    stopwords_found: Optional[List[StopwordFinding]] = None
+    important_words: Optional[List[TaggedWord]] = None
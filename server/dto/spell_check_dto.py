@@ -1,4 +1,4 @@
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Union
 from pydantic import BaseModel, Field
 
 
@@ -7,6 +7,9 @@ class SpellCheckRequest(BaseModel):
     Request model for spell checking.
     """
     text: str = Field(..., description="The text to check for spelling errors", min_length=1)
+    language: Optional[str] = Field(None, description="Language code of the dictionary to use (defaults to the server default)")
+    tenant_id: Optional[str] = Field(None, description="Tenant whose custom dictionary is layered over the shared one")
+    custom_words: Optional[List[str]] = Field(None, description="Extra words accepted for this request only", max_length=1000)
 
 
 class BatchSpellCheckRequest(BaseModel):
@@ -14,6 +17,9 @@ class BatchSpellCheckRequest(BaseModel):
     Request model for batch spell checking multiple texts.
     """
     texts: List[str] = Field(..., description="List of texts to check for spelling errors", min_items=1)
+    language: Optional[str] = Field(None, description="Language code of the dictionary to use (defaults to the server default)")
+    tenant_id: Optional[str] = Field(None, description="Tenant whose custom dictionary is layered over the shared one")
+    custom_words: Optional[List[str]] = Field(None, description="Extra words accepted for this request only", max_length=1000)
 
 
 class MisspelledWord(BaseModel):
@@ -57,7 +63,7 @@ class BatchSpellCheckResponse(BaseModel):
     status: str = Field(..., description="Status of the operation (success/error)")
     message: str = Field(..., description="Descriptive message about the result")
     results: List[SpellCheckResponse] = Field(default=[], description="List of spell check results")
-    summary: Optional[Dict[str, int]] = Field(None, description="Summary statistics for the batch operation")
+    summary: Optional[Dict[str, Union[int, float]]] = Field(None, description="Summary statistics for the batch operation")
 
 
 class SpellCheckSummary(BaseModel):
@@ -67,4 +73,62 @@ class SpellCheckSummary(BaseModel):
     total_texts: int
     total_words: int
     total_misspelled: int
-    overall_accuracy: float
\ No newline at end of file
+    overall_accuracy: float
+
+
+class TenantDictionaryRequest(BaseModel):
+    """
+    Request model for adding words to a tenant's custom dictionary.
+    """
+    words: List[str] = Field(..., description="Words to add to the tenant dictionary", min_length=1)
+
+
+class TenantDictionaryResponse(BaseModel):
+    """
+    Response model describing a tenant's custom dictionary.
+    """
+    tenant_id: str = Field(..., description="Tenant identifier")
+    word_count: int = Field(..., description="Number of words in the tenant dictionary")
+
+
+class TextEdit(BaseModel):
+    """
+    Model describing a replacement of text[start:end] in a document.
+    """
+    start: int = Field(..., ge=0, description="Start offset of the replaced range")
+    end: int = Field(..., ge=0, description="End offset of the replaced range (exclusive)")
+    replacement: str = Field("", description="Text inserted in place of the range")
+
+
+class IncrementalSpellCheckRequest(BaseModel):
+    """
+    Request model for incremental spell checking of an open document.
+
+    Send `text` to open (or resync) a document and `edit` for each change.
+    """
+    document_id: Optional[str] = Field(None, description="Server issued document identifier; omit to open a new document", min_length=1, max_length=200)
+    text: Optional[str] = Field(None, description="Full document text, to open or resync the document")
+    edit: Optional[TextEdit] = Field(None, description="Edit applied to the stored document")
+    language: Optional[str] = Field(None, description="Language code of the dictionary to use (defaults to the server default)")
+    tenant_id: Optional[str] = Field(None, description="Tenant whose custom dictionary is layered over the shared one")
+    custom_words: Optional[List[str]] = Field(None, description="Extra words accepted for this request only", max_length=1000)
+
+
+class IncrementalSpellCheckResponse(BaseModel):
+    """
+    Response model containing only the misspellings changed by an edit.
+
+    Entries in `removed` use positions from before the edit, entries in
+    `added` use positions after it. Every other misspelling at or after
+    `shift_from` (old coordinates) moves by `shift_delta`.
+    """
+    status: str = Field(..., description="Status of the operation (success/error)")
+    message: str = Field(..., description="Descriptive message about the result")
+    document_id: str = Field(..., description="Server issued document identifier to send with later edits")
+    version: int = Field(..., description="Number of edits applied since the document was opened")
+    total_words: int = Field(..., description="Total number of words in the document")
+    misspelled_count: int = Field(..., description="Number of misspelled words in the document")
+    shift_from: Optional[int] = Field(None, description="Old offset from which positions shift")
+    shift_delta: int = Field(0, description="Amount by which later positions shift")
+    removed: List[MisspelledWord] = Field(default=[], description="Misspellings no longer present")
+    added: List[MisspelledWord] = Field(default=[], description="New misspellings")
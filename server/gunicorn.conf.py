@@ -0,0 +1,31 @@
+# Multi-worker deployment with shared model weights:
+#
+#   gunicorn -c gunicorn.conf.py main:app
+#
+# The app and the AI models are loaded once in the master; workers are
+# forked from it and share the weight pages copy-on-write instead of each
+# holding their own copy.
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = 120
+
+
+def when_ready(server):
+    if os.environ.get("AI_MODELS_PRELOAD", "1") != "0":
+        from services.shared_models import preload_shared_models
+        try:
+            preload_shared_models()
+        except Exception as e:
+            # Don't take the master down: the loader is left in its failed
+            # state, so every worker retries the load in the background
+            print(f"Warning: Could not preload the AI models, workers load their own: {e}")
+
+
+def post_fork(server, worker):
+    if os.environ.get("AI_MODELS_PRELOAD", "1") != "0":
+        from services.shared_models import configure_worker_threads
+        configure_worker_threads(workers)
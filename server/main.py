@@ -1,9 +1,41 @@
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers.optimize_router import optimize_router
-from routers.spell_check_router import router
-from routers.ai_prompt_optimize import ai_optimize_router
-app = FastAPI(title="Prompt Optimizer")
+from starlette.concurrency import run_in_threadpool
+from routers.optimize_router import optimize_router, warm_up_optimize_services
+from routers.spell_check_router import router, spell_checker_pool, DEFAULT_LANGUAGE
+from routers.ai_prompt_optimize import ai_optimize_router, ai_model_loader
+from services.inference_executor import inference_executor
+from services.result_cache import result_cache
+from services.optimize_batch import batch_optimizer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the shared rule-based services once per worker and warm them up
+    # so the first real request doesn't pay for corpus and tokenizer loading.
+    try:
+        await run_in_threadpool(warm_up_optimize_services)
+    except Exception as e:
+        # The spell check and AI routes don't need these services; the
+        # rule-based routes retry the load per request and answer 503 until
+        # the NLTK data and tiktoken encodings are provisioned
+        print(f"Warning: Could not warm up the optimize services: {e}")
+    # Start loading the default spell check dictionary in the background
+    spell_checker_pool.get_future(DEFAULT_LANGUAGE)
+    # Load the AI models in the background; /ai_prompt-optimizer/health/ready
+    # reports 503 until they are available
+    if os.environ.get("AI_MODELS_EAGER_LOAD", "1") != "0":
+        ai_model_loader.start()
+    yield
+    inference_executor.shutdown()
+    batch_optimizer.shutdown()
+    spell_checker_pool.shutdown()
+    ai_model_loader.shutdown()
+
+
+app = FastAPI(title="Prompt Optimizer", lifespan=lifespan)
 
 app.include_router(optimize_router)
 app.include_router(router)
@@ -21,3 +53,9 @@ app.add_middleware(
 @app.get("/")
 def readroot():
     return {"message": "welcome to prompt optimizer backend"}
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss counters of the optimization result cache."""
+    return result_cache.stats()
@@ -1,30 +1,57 @@
+import asyncio
+import json
+import os
+import threading
 from fastapi import APIRouter, Depends, HTTPException
-from dto.ai_optimize_dto import HealthResponse, OptimizedPromptResponse, PromptRequest, KeywordResponse, SummaryResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from dto.ai_optimize_dto import HealthResponse, OptimizedPromptResponse, PromptRequest, KeywordResponse, SummaryResponse, ReadinessResponse
 from services.aiOptimise import PromptOptimizer
+from services.model_loader import ModelLoader
+from services.inference_executor import inference_executor
+from services.result_cache import result_cache
 ai_optimize_router = APIRouter(
     prefix="/ai_prompt-optimizer",
     tags=["AI Prompt Optimization"],
 )
-optimizer = None
+
+# Models are loaded once per worker in the background (see main.lifespan);
+# requests get 503 until they are ready instead of waiting for the load.
+ai_model_loader = ModelLoader(PromptOptimizer)
+
+# Longest wait for the next streamed chunk, including time queued for a slot
+SUMMARY_STREAM_TIMEOUT = float(os.environ.get("SUMMARY_STREAM_TIMEOUT", "60"))
 
 
 def get_optimizer() -> PromptOptimizer:
     """Dependency to get the optimizer instance."""
-    global optimizer
-    if optimizer is None:
-        optimizer = PromptOptimizer()
-    return optimizer
+    return ai_model_loader.get()
+
 
 @ai_optimize_router.get("/health", response_model=HealthResponse)
-async def health_check(opt: PromptOptimizer = Depends(get_optimizer)):
-    """Health check endpoint."""
+async def health_check():
+    """Health check endpoint. Never triggers model loading."""
     return HealthResponse(
-        status="healthy" if opt.models_loaded else "unhealthy",
-        models_loaded=opt.models_loaded,
+        status="healthy" if ai_model_loader.ready else ai_model_loader.state,
+        models_loaded=ai_model_loader.ready,
         version="1.0.0"
     )
 
 
+@ai_optimize_router.get("/health/live")
+async def liveness():
+    """Liveness probe: the worker is up and serving requests."""
+    return {"status": "alive"}
+
+
+@ai_optimize_router.get("/health/ready", response_model=ReadinessResponse)
+async def readiness():
+    """Readiness probe: 200 once every model is loaded, 503 until then."""
+    status = ReadinessResponse(**ai_model_loader.status())
+    return JSONResponse(
+        status_code=200 if ai_model_loader.ready else 503,
+        content=status.model_dump())
+
+
 @ai_optimize_router.post("/optimize", response_model=OptimizedPromptResponse)
 async def optimize_prompt(
     request: PromptRequest,
@@ -41,7 +68,26 @@ async def optimize_prompt(
     if not opt.models_loaded:
         raise HTTPException(status_code=503, detail="Models not loaded")
 
-    return opt.optimize_prompt(request)
+    cache_key = result_cache.make_key(
+        "ai_optimize", request.text, max_length=request.max_length,
+        min_length=request.min_length, top_keywords=request.top_keywords)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        return OptimizedPromptResponse(**cached)
+
+    # The summary waits for its batch on the event loop; only keyword
+    # extraction needs an inference slot
+    summary, keywords = await asyncio.gather(
+        opt.summarize_prompt_async(
+            request.text, request.max_length, request.min_length),
+        inference_executor.run(
+            opt.extract_keywords, request.text, request.top_keywords))
+    try:
+        response = opt.build_optimized_response(request, summary, keywords)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Optimization failed: {str(e)}")
+    result_cache.set(cache_key, response.model_dump())
+    return response
 
 
 @ai_optimize_router.post("/summarize", response_model=SummaryResponse)
@@ -59,8 +105,66 @@ async def summarize_text(
     if not opt.models_loaded:
         raise HTTPException(status_code=503, detail="Models not loaded")
 
-    return opt.summarize_prompt(request.text, request.max_length,
-                                request.min_length)
+    # Submitted straight to the summary batcher: holding an inference slot
+    # while waiting would cap batches at INFERENCE_MAX_CONCURRENCY
+    return await opt.summarize_prompt_async(
+        request.text, request.max_length, request.min_length)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@ai_optimize_router.post("/summarize/stream")
+async def summarize_text_stream(
+    request: PromptRequest,
+    opt: PromptOptimizer = Depends(get_optimizer)
+):
+    """
+    Summarize text using DistilBART, streaming the summary as server-sent events.
+
+    Emits a `token` event per generated text chunk and finishes with a
+    `summary` event carrying the full SummaryResponse (or an `error` event).
+    """
+    if not opt.models_loaded:
+        raise HTTPException(status_code=503, detail="Models not loaded")
+
+    streamer = opt.create_summary_streamer(timeout=SUMMARY_STREAM_TIMEOUT)
+    cancel = threading.Event()
+    # Raises 503 before the response starts if inference is saturated
+    generation = inference_executor.submit(
+        opt.generate_summary_stream, request.text, request.max_length,
+        request.min_length, streamer, cancel)
+    # End the stream however generation finishes, including when the job
+    # fails or is cancelled before it ever ran
+    generation.add_done_callback(lambda _: streamer.end())
+
+    async def events():
+        chunks = []
+        try:
+            async for chunk in streamer:
+                if chunk:
+                    chunks.append(chunk)
+                    yield _sse("token", {"text": chunk})
+            # The stream can end just before the generation thread returns
+            await asyncio.wait([generation])
+            if generation.cancelled():
+                yield _sse("error", {"detail": "Summarization was cancelled"})
+                return
+            generation.result()
+            summary = opt.build_summary_response(request.text, "".join(chunks).strip())
+            yield _sse("summary", summary.model_dump())
+        except asyncio.TimeoutError:
+            yield _sse("error", {"detail": "Summarization timed out"})
+        except Exception as e:
+            yield _sse("error", {"detail": f"Summarization failed: {str(e)}"})
+        finally:
+            # Client went away (or we are done): stop generating
+            cancel.set()
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 @ai_optimize_router.post("/keywords", response_model=KeywordResponse)
@@ -77,4 +181,5 @@ async def extract_keywords(
     if not opt.models_loaded:
         raise HTTPException(status_code=503, detail="Models not loaded")
 
-    return opt.extract_keywords(request.text, request.top_keywords)
+    return await inference_executor.run(
+        opt.extract_keywords, request.text, request.top_keywords)
@@ -1,40 +1,201 @@
-from fastapi import APIRouter
+import json
+import os
+import threading
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
 from services.optimize import PromptOptimizer
 from services.energy_calculation import TokenEnergyCalculator
-from dto.optimize_prompt_dto import PromptRequest, EnergySavedResponse
+from services.result_cache import result_cache
+from services.optimize_batch import (
+    optimize_with_energy, analyze_with_energy_v2, optimize_cache_key,
+    batch_optimizer)
+from services.live_analysis import LiveAnalysisSession
+from services.bulk_energy import estimate_bulk
+from dto.energy_dto import BulkEnergyRequest, BulkEnergyResponse
+from dto.optimize_prompt_dto import (
+    PromptRequest, EnergySavedResponse, BatchPromptRequest,
+    BatchEnergySavedResponse, LivePromptRevision, PromptRequestV2,
+    PromptAnalysisResponseV2)
 
 optimize_router = APIRouter(tags=["Prompt Optimize"])
 
+# Built once per worker (see main.lifespan) and shared by every request.
+# Both objects are only read after construction, so sharing them is safe.
+prompt_optimizer = None
+energy_calculator = None
+_services_lock = threading.Lock()
+
+LIVE_DEBOUNCE_MS = int(os.environ.get("LIVE_ANALYSIS_DEBOUNCE_MS", "150"))
+
+WARMUP_PROMPT = "Can you please help me write a short summary of this text?"
+
+
+def load_optimize_services():
+    """Build the shared optimizer and energy calculator exactly once."""
+    global prompt_optimizer, energy_calculator
+    with _services_lock:
+        if prompt_optimizer is None:
+            prompt_optimizer = PromptOptimizer()
+        if energy_calculator is None:
+            energy_calculator = TokenEnergyCalculator()
+
+
+def warm_up_optimize_services():
+    """Load the shared services and run a throwaway request through them."""
+    load_optimize_services()
+    optimize_prompt(
+        PromptRequest(text=WARMUP_PROMPT, model_name="gpt-4"),
+        prompt_optimizer, energy_calculator)
+
+
+def _require_optimize_services():
+    """Load the shared services, reporting 503 while they can't be built."""
+    try:
+        load_optimize_services()
+    except Exception as e:
+        # e.g. NLTK data or tiktoken encodings not provisioned yet
+        raise HTTPException(status_code=503, detail=f"Optimize services unavailable: {e}")
+
+
+def get_prompt_optimizer() -> PromptOptimizer:
+    """Dependency to get the shared rule-based optimizer."""
+    if prompt_optimizer is None:
+        _require_optimize_services()
+    return prompt_optimizer
+
+
+def get_energy_calculator() -> TokenEnergyCalculator:
+    """Dependency to get the shared energy calculator."""
+    if energy_calculator is None:
+        _require_optimize_services()
+    return energy_calculator
+
 
 @optimize_router.post("/optimize")
-def optimize_prompt(prompt: PromptRequest):
-    energy_calculator = TokenEnergyCalculator()
-    original_prompt_energy = energy_calculator.analyze_prompt(prompt=prompt.text, model=prompt.model_name)
-    prompt_optimizer = PromptOptimizer()
-    response = prompt_optimizer.analyze_prompt(prompt=prompt.text)
-    balanced_prompt_energy = energy_calculator.analyze_prompt(prompt=response.balanced, model=prompt.model_name)
-    aggresive_prompt_energy = energy_calculator.analyze_prompt(prompt=response.aggressive, model=prompt.model_name)
-    conservative_prompt_energy = energy_calculator.analyze_prompt(prompt=response.conservative, model=prompt.model_name)
-    energy_saved_balanced=original_prompt_energy.energy_mwh-balanced_prompt_energy.energy_mwh
-    energy_saved_aggresive=original_prompt_energy.energy_mwh-aggresive_prompt_energy.energy_mwh
-    energy_saved_conservative = original_prompt_energy.energy_mwh-conservative_prompt_energy.energy_mwh
-    response_energy = EnergySavedResponse(
-        original=response.original,
-        conservative=response.conservative,
-        aggressive=response.aggressive,
-        balanced=response.balanced,
-        removed_clauses=response.removed_clauses,
-        text_after_clause_removal=response.text_after_clause_removal,
-        pos_analysis=response.pos_analysis,
-        stopwords_found=response.stopwords_found,
-        important_words=response.important_words,
-        energy_saved_balanced=energy_saved_balanced,
-        energy_saved_aggressive=energy_saved_aggresive,
-        energy_saved_conservative=energy_saved_conservative,
-        original_energy=original_prompt_energy.energy_mwh,
-        co2emission_conservative=conservative_prompt_energy.co2_grams,
-        co2emission_aggresive=aggresive_prompt_energy.co2_grams,
-        co2emission_balanced=balanced_prompt_energy.co2_grams,
-        co2emission_original=original_prompt_energy.co2_grams
-    )
+def optimize_prompt(
+    prompt: PromptRequest,
+    prompt_optimizer: PromptOptimizer = Depends(get_prompt_optimizer),
+    energy_calculator: TokenEnergyCalculator = Depends(get_energy_calculator)
+):
+    cache_key = optimize_cache_key(prompt.text, prompt.model_name, prompt.region)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        return EnergySavedResponse(**cached)
+
+    response_energy = optimize_with_energy(prompt, prompt_optimizer, energy_calculator)
+    result_cache.set(cache_key, response_energy.model_dump())
     return response_energy
+
+
+@optimize_router.post("/v2/optimize", response_model=PromptAnalysisResponseV2,
+                      response_model_exclude_none=True)
+def optimize_prompt_v2(
+    prompt: PromptRequestV2,
+    prompt_optimizer: PromptOptimizer = Depends(get_prompt_optimizer),
+    energy_calculator: TokenEnergyCalculator = Depends(get_energy_calculator)
+):
+    """
+    Optimize a prompt with typed diagnostics.
+
+    Pass `fields` to compute and return only what the client uses, e.g.
+    ["balanced", "energy"] skips POS analysis and stopword diagnostics.
+    """
+    fields = sorted(set(prompt.fields)) if prompt.fields else None
+    cache_key = optimize_cache_key(
+        prompt.text, prompt.model_name, prompt.region,
+        namespace="optimize_v2", fields=fields)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        return PromptAnalysisResponseV2(**cached)
+
+    response = analyze_with_energy_v2(prompt, prompt_optimizer, energy_calculator)
+    result_cache.set(cache_key, response.model_dump())
+    return response
+
+
+@optimize_router.post("/optimize/batch", response_model=BatchEnergySavedResponse)
+def optimize_prompt_batch(request: BatchPromptRequest):
+    """
+    Optimize many prompts in one call using a process pool.
+
+    Items that fail are reported with an error instead of failing the batch.
+    """
+    return batch_optimizer.optimize(request.prompts)
+
+
+@optimize_router.post("/energy/bulk", response_model=BulkEnergyResponse)
+def estimate_energy_bulk(
+    request: BulkEnergyRequest,
+    energy_calculator: TokenEnergyCalculator = Depends(get_energy_calculator)
+):
+    """
+    Estimate energy and CO2 for many prompts at once, returned as columns.
+    """
+    try:
+        estimate = estimate_bulk(
+            token_counts=request.token_counts, texts=request.texts,
+            models=request.model_name, regions=request.region,
+            calculator=energy_calculator)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    columns = estimate.columns()
+    return BulkEnergyResponse(
+        registry_version=estimate.registry_version,
+        count=len(estimate),
+        tokens=columns["tokens"].tolist(),
+        model=columns["model"].tolist(),
+        region=columns["region"].tolist(),
+        energy_wh=columns["energy_wh"].tolist(),
+        energy_mwh=columns["energy_mwh"].tolist(),
+        co2_grams=columns["co2_grams"].tolist(),
+        totals=estimate.totals(),
+        rows=estimate.to_records() if request.include_rows else None
+    )
+
+
+@optimize_router.websocket("/optimize/live")
+async def optimize_prompt_live(websocket: WebSocket):
+    """
+    Live analysis over one long-lived connection.
+
+    The client sends {"text", "model_name", "revision"} for every revision.
+    The server debounces revisions, drops outdated ones, and streams
+    "original", "variant" (x3) and "done" messages tagged with the revision
+    they belong to, or "error" messages.
+    """
+    await websocket.accept()
+    # The first connection of a worker may still have to build the services
+    try:
+        prompt_optimizer, energy_calculator = await run_in_threadpool(
+            lambda: (get_prompt_optimizer(), get_energy_calculator()))
+    except HTTPException as e:
+        await websocket.send_json({"type": "error", "revision": None, "detail": e.detail})
+        await websocket.close(code=1011)
+        return
+    session = LiveAnalysisSession(
+        websocket.send_json, prompt_optimizer, energy_calculator,
+        debounce_ms=LIVE_DEBOUNCE_MS)
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError as e:
+                await websocket.send_json({
+                    "type": "error", "revision": None, "detail": f"Invalid JSON: {e}"})
+                continue
+            try:
+                revision = LivePromptRevision.model_validate(message)
+            except ValidationError as e:
+                await websocket.send_json({
+                    "type": "error",
+                    "revision": message.get("revision") if isinstance(message, dict) else None,
+                    "detail": e.errors(include_url=False, include_context=False),
+                })
+                continue
+            session.submit(revision)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await session.close()
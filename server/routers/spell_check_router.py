@@ -1,11 +1,53 @@
+import os
 from fastapi import APIRouter, HTTPException, Query
 from services.spellCheck import SpellCheckService
-from dto.spell_check_dto import SpellCheckRequest, SpellCheckResponse
+from services.tenant_dictionaries import TenantDictionaryStore
+from services.spell_checker_pool import SpellCheckerPool
+from services.spell_check_sessions import SpellCheckSessionStore
+from dto.spell_check_dto import (
+    SpellCheckRequest, SpellCheckResponse, BatchSpellCheckRequest,
+    BatchSpellCheckResponse, TenantDictionaryRequest, TenantDictionaryResponse,
+    IncrementalSpellCheckRequest, IncrementalSpellCheckResponse)
 
 router = APIRouter(tags=["Spelling check"])
 
-# Initialize the spell check service
-spell_check_service = SpellCheckService()
+DEFAULT_LANGUAGE = os.environ.get("SPELL_CHECK_DEFAULT_LANGUAGE", "en")
+SPELL_CHECK_BACKEND = os.environ.get("SPELL_CHECK_BACKEND", "pyspellchecker")
+
+# One spell check service per language, loaded on first use in the background
+spell_checker_pool = SpellCheckerPool(
+    lambda language: SpellCheckService(
+        language=language, backend=SPELL_CHECK_BACKEND, strict=True),
+    max_languages=int(os.environ.get("SPELL_CHECK_MAX_LANGUAGES", "3")),
+    max_bytes=int(os.environ.get("SPELL_CHECK_MAX_DICTIONARY_BYTES", str(512 * 1024 * 1024))))
+
+# Custom words per tenant, layered over the shared (never mutated) dictionary;
+# persisted in TENANT_DICTIONARY_DIR (or Redis) and cached per worker
+tenant_dictionaries = TenantDictionaryStore.from_env()
+
+# Per-document state for incremental (keystroke level) checks
+spell_check_sessions = SpellCheckSessionStore(
+    max_documents=int(os.environ.get("SPELL_CHECK_MAX_DOCUMENTS", "10000")),
+    idle_ttl=int(os.environ.get("SPELL_CHECK_DOCUMENT_IDLE_TTL", "1800")))
+
+
+def _dictionary_error(e: Exception) -> HTTPException:
+    """Map a failed language lookup to a client (400) or server (503) error."""
+    if isinstance(e, ValueError):
+        return HTTPException(status_code=400, detail=str(e))
+    if isinstance(e, FileNotFoundError):
+        # e.g. the SymSpell index of the language was never built
+        return HTTPException(status_code=503, detail=str(e))
+    return HTTPException(status_code=503, detail=f"Dictionary could not be loaded: {e}")
+
+
+def _custom_words(tenant_id, custom_words):
+    """Combine the tenant's words with per-request words, if any."""
+    words = tenant_dictionaries.get(tenant_id) if tenant_id else frozenset()
+    if custom_words:
+        words = words | TenantDictionaryStore.normalize(custom_words)
+    return words or None
+
 
 @router.post("/spell-check", response_model=SpellCheckResponse)
 async def spell_check(request: SpellCheckRequest):
@@ -13,7 +55,135 @@ async def spell_check(request: SpellCheckRequest):
     Check spelling for a single text via request body.
     """
     try:
-        result = spell_check_service.check_spelling(request.text)
+        spell_check_service = await spell_checker_pool.get_async(
+            request.language or DEFAULT_LANGUAGE)
+    except Exception as e:
+        raise _dictionary_error(e)
+    try:
+        result = spell_check_service.check_spelling(
+            request.text,
+            custom_words=_custom_words(request.tenant_id, request.custom_words))
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/spell-check/batch", response_model=BatchSpellCheckResponse)
+def batch_spell_check(request: BatchSpellCheckRequest):
+    """
+    Check spelling for several texts, computing suggestions once per unique
+    misspelled word across the whole batch.
+    """
+    try:
+        spell_check_service = spell_checker_pool.get(
+            request.language or DEFAULT_LANGUAGE)
+    except Exception as e:
+        raise _dictionary_error(e)
+    try:
+        return spell_check_service.batch_check_spelling(
+            request.texts,
+            custom_words=_custom_words(request.tenant_id, request.custom_words))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/spell-check/incremental", response_model=IncrementalSpellCheckResponse)
+def incremental_spell_check(request: IncrementalSpellCheckRequest):
+    """
+    Open a document with its full text, then send edits to re-check only the
+    words they touch.
+
+    Opening returns a server issued `document_id` that every edit must
+    carry. Documents live in one worker; an edit answered with 409 must be
+    followed by a resync with the full text, which may issue a new id.
+    """
+    language = request.language or DEFAULT_LANGUAGE
+    try:
+        spell_check_service = spell_checker_pool.get(language)
+    except Exception as e:
+        raise _dictionary_error(e)
+    custom_words = _custom_words(request.tenant_id, request.custom_words)
+
+    try:
+        if request.text is not None:
+            document_id, state = spell_check_sessions.open(
+                request.text, language, spell_check_service, custom_words,
+                document_id=request.document_id)
+            removed, added, shift_from, delta = [], state.misspelled, None, 0
+            message = "Document opened"
+        elif request.edit is not None:
+            document_id = request.document_id
+            state = spell_check_sessions.get(document_id) if document_id else None
+            if state is None or state.language != language:
+                raise HTTPException(
+                    status_code=409,
+                    detail="Unknown document (expired or opened on another worker), resend the full text")
+            removed, added, shift_from, delta = spell_check_sessions.apply_edit(
+                state, request.edit.start, request.edit.end,
+                request.edit.replacement, spell_check_service, custom_words)
+            message = f"{len(removed)} removed, {len(added)} added"
+        else:
+            raise HTTPException(status_code=400, detail="Either text or edit is required")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return IncrementalSpellCheckResponse(
+        status="success",
+        message=message,
+        document_id=document_id,
+        version=state.version,
+        total_words=state.total_words,
+        misspelled_count=len(state.misspelled),
+        shift_from=shift_from,
+        shift_delta=delta,
+        removed=removed,
+        added=added
+    )
+
+
+@router.delete("/spell-check/incremental/{document_id}")
+def close_incremental_document(document_id: str):
+    """
+    Drop the stored state of an incrementally checked document.
+    """
+    if not spell_check_sessions.close(document_id):
+        raise HTTPException(status_code=404, detail="Document not found")
+    return {"status": "success", "message": f"Closed document {document_id}"}
+
+
+@router.get("/spell-check/languages/stats")
+def language_pool_stats():
+    """
+    Residency and load-time metrics for language dictionaries.
+    """
+    return spell_checker_pool.stats()
+
+
+@router.get("/spell-check/dictionaries/stats")
+def tenant_dictionary_stats():
+    """
+    Memory accounting for tenant dictionaries.
+    """
+    return tenant_dictionaries.stats()
+
+
+@router.post("/spell-check/dictionaries/{tenant_id}", response_model=TenantDictionaryResponse)
+def add_tenant_words(tenant_id: str, request: TenantDictionaryRequest):
+    """
+    Add words to a tenant's custom dictionary.
+    """
+    try:
+        words = tenant_dictionaries.add_words(tenant_id, request.words)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TenantDictionaryResponse(tenant_id=tenant_id, word_count=len(words))
+
+
+@router.delete("/spell-check/dictionaries/{tenant_id}")
+def remove_tenant_dictionary(tenant_id: str):
+    """
+    Drop a tenant's custom dictionary.
+    """
+    if not tenant_dictionaries.remove_tenant(tenant_id):
+        raise HTTPException(status_code=404, detail="Tenant dictionary not found")
+    return {"status": "success", "message": f"Removed dictionary for {tenant_id}"}
@@ -1,62 +1,177 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Callable, List, Optional
 from fastapi import APIRouter, HTTPException, Depends
-from transformers import pipeline
-from keybert import KeyBERT
 from dto.ai_optimize_dto import (
     PromptRequest, KeywordResponse, SummaryResponse,
     OptimizedPromptResponse)
+from services.inference_backends import load_summarizer, load_embedding_model
+from services.phrase_embedding_cache import PhraseEmbeddingCache
+from services.summary_batcher import SummaryBatcher, SummaryQueueFull
 
 
 class PromptOptimizer:
-    def __init__(self):
+    def __init__(self, backend: Optional[str] = None,
+                 progress: Optional[Callable[[str, str, Optional[float]], None]] = None):
+        """
+        Load the summarization and keyword models.
+
+        Args:
+            backend: Inference backend (default: AI_INFERENCE_BACKEND or pytorch)
+            progress: Called as progress(model, status, load_seconds) when
+                each model starts ("loading") and finishes ("ready")
+        """
+        # Heavy ML imports are deferred so importing the app stays fast
+        from keybert import KeyBERT
+
+        report = progress or (lambda model, status, seconds=None: None)
+        # pytorch (full precision), int8 (dynamic quantization) or onnx
+        self.backend = backend or os.environ.get("AI_INFERENCE_BACKEND", "pytorch")
         try:
             # Summarizer based on DistilBART (fine-tuned DistilBERT for summarization)
-            self.summarizer = pipeline(
-                "summarization",
-                model="sshleifer/distilbart-cnn-12-6",
-                tokenizer="sshleifer/distilbart-cnn-12-6"
+            report("summarizer", "loading", None)
+            start = time.perf_counter()
+            self.summarizer = load_summarizer(self.backend)
+            report("summarizer", "ready", time.perf_counter() - start)
+            # Concurrent summarize calls are coalesced into padded batches
+            self.summary_batcher = SummaryBatcher(
+                self.summarizer,
+                max_batch_size=int(os.environ.get("SUMMARY_MAX_BATCH_SIZE", "8")),
+                max_wait_ms=float(os.environ.get("SUMMARY_MAX_WAIT_MS", "10")),
+                max_pending=int(os.environ.get("SUMMARY_MAX_PENDING", "64"))
             )
             # KeyBERT initialized with DistilBERT sentence embeddings
-            self.keyword_extractor = KeyBERT('distilbert-base-nli-mean-tokens')
+            report("keyword_extractor", "loading", None)
+            start = time.perf_counter()
+            self.keyword_extractor = KeyBERT(load_embedding_model(self.backend))
+            report("keyword_extractor", "ready", time.perf_counter() - start)
+            # Candidate phrases recur across prompts; embed each one only once
+            self.phrase_embeddings = PhraseEmbeddingCache(
+                self.keyword_extractor.model.embed,
+                max_size=int(os.environ.get("PHRASE_EMBEDDING_CACHE_SIZE", "50000"))
+            )
             self.models_loaded = True
         except Exception as e:
             self.models_loaded = False
             raise
 
+    @staticmethod
+    def build_summary_response(text: str, summary_text: str) -> SummaryResponse:
+        return SummaryResponse(
+            summary=summary_text,
+            original_length=len(text),
+            summary_length=len(summary_text),
+            compression_ratio=len(summary_text) / len(text)
+        )
+
     def summarize_prompt(self, text: str, max_length: int = 50, min_length: int = 20) -> SummaryResponse:
         """Uses DistilBERT to summarize the prompt and returns structured response."""
         try:
-            summary = self.summarizer(
-                text, max_length=max_length, min_length=min_length,
-                do_sample=False
-            )
-            summary_text = summary[0]['summary_text']
+            summary_text = self.summary_batcher.summarize(
+                text, max_length, min_length)
 
-            return SummaryResponse(
-                summary=summary_text,
-                original_length=len(text),
-                summary_length=len(summary_text),
-                compression_ratio=len(summary_text) / len(text)
-            )
+            return self.build_summary_response(text, summary_text)
         except Exception as e:
             raise HTTPException(
                 status_code=500, detail=f"Summarization failed: {str(e)}")
 
+    async def summarize_prompt_async(self, text: str, max_length: int = 50,
+                                     min_length: int = 20) -> SummaryResponse:
+        """Like summarize_prompt, but awaits the batch on the event loop.
+
+            Waiting callers hold no inference thread, so concurrent requests
+            can actually fill a batch."""
+        try:
+            future = self.summary_batcher.submit(text, max_length, min_length)
+        except SummaryQueueFull:
+            raise HTTPException(
+                status_code=503, detail="Summarization queue is full, retry later",
+                headers={"Retry-After": "1"})
+        try:
+            summary_text = await asyncio.wrap_future(future)
+            return self.build_summary_response(text, summary_text)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Summarization failed: {str(e)}")
+
+    def create_summary_streamer(self, timeout: Optional[float] = None):
+        """Returns an async iterator that yields summary text as it is generated.
+
+            Must be created on the event loop. Iteration raises TimeoutError
+            if no text arrives within `timeout` seconds."""
+        from transformers import AsyncTextIteratorStreamer
+
+        return AsyncTextIteratorStreamer(
+            self.summarizer.tokenizer, skip_prompt=True,
+            skip_special_tokens=True, timeout=timeout)
+
+    def generate_summary_stream(self, text: str, max_length: int, min_length: int,
+                                streamer, cancel: Optional[threading.Event] = None) -> None:
+        """Generates a summary token by token into `streamer`.
+
+            Streaming requires greedy decoding, so the text can differ
+            slightly from the beam-searched summarize_prompt output.
+            Generation stops early once `cancel` is set."""
+        from transformers import StoppingCriteria, StoppingCriteriaList
+
+        class _Cancelled(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs):
+                return cancel is not None and cancel.is_set()
+
+        tokenizer = self.summarizer.tokenizer
+        model = self.summarizer.model
+        inputs = tokenizer(
+            text, return_tensors="pt", truncation=True,
+            max_length=tokenizer.model_max_length).to(model.device)
+        model.generate(
+            **inputs,
+            max_length=max_length,
+            min_length=min_length,
+            num_beams=1,
+            do_sample=False,
+            streamer=streamer,
+            stopping_criteria=StoppingCriteriaList([_Cancelled()])
+        )
+
     def extract_keywords(self, text: str, top_n: int = 5) -> KeywordResponse:
         """Uses KeyBERT with DistilBERT to extract keywords
             and returns structured response."""
+        return self.extract_keywords_batch([text], top_n)[0]
+
+    def extract_keywords_batch(self, texts: List[str], top_n: int = 5) -> List[KeywordResponse]:
+        """Extracts keywords for many documents in one KeyBERT call,
+            reusing cached candidate-phrase embeddings."""
+        from sklearn.feature_extraction.text import CountVectorizer
+
         try:
+            vectorizer = CountVectorizer(
+                ngram_range=(1, 2), stop_words='english')
+            try:
+                phrases = list(vectorizer.fit(texts).get_feature_names_out())
+            except ValueError:
+                # Only stopwords in every document, nothing to extract
+                return [KeywordResponse(keywords=[], count=0) for _ in texts]
+
             keywords = self.keyword_extractor.extract_keywords(
-                text,
-                keyphrase_ngram_range=(1, 2),
-                stop_words='english',
-                top_n=top_n
+                texts,
+                vectorizer=vectorizer,
+                top_n=top_n,
+                doc_embeddings=self.keyword_extractor.model.embed(texts),
+                word_embeddings=self.phrase_embeddings.get_many(phrases)
             )
-            keyword_list = [kw[0] for kw in keywords]
+            # KeyBERT unwraps the result list for a single document
+            if len(texts) == 1:
+                keywords = [keywords]
 
-            return KeywordResponse(
-                keywords=keyword_list,
-                count=len(keyword_list)
-            )
+            return [
+                KeywordResponse(
+                    keywords=[kw[0] for kw in doc_keywords],
+                    count=len(doc_keywords)
+                )
+                for doc_keywords in keywords
+            ]
         except Exception as e:
             raise HTTPException(
                 status_code=500, detail=f"Keyword extraction failed: {str(e)}")
@@ -66,6 +181,30 @@ class PromptOptimizer:
         keyword_response = self.extract_keywords(text, top_n)
         return ' '.join(keyword_response.keywords)
 
+    @staticmethod
+    def build_optimized_response(request: PromptRequest,
+                                 summary_response: SummaryResponse,
+                                 keyword_response: KeywordResponse) -> OptimizedPromptResponse:
+        keyword_compressed = ' '.join(keyword_response.keywords)
+
+        # Calculate compression ratios
+        original_len = len(request.text)
+        summary_len = len(summary_response.summary)
+        keyword_len = len(keyword_compressed)
+
+        return OptimizedPromptResponse(
+            original=request.text,
+            original_length=original_len,
+            summarized=summary_response.summary,
+            summary_length=summary_len,
+            keyword_based=keyword_compressed,
+            keywords_count=keyword_response.count,
+            compression_ratios={
+                "summary": summary_len / original_len,
+                "keywords": keyword_len / original_len
+            }
+        )
+
     def optimize_prompt(self, request: PromptRequest) -> OptimizedPromptResponse:
         """Returns comprehensive optimization results
             with structured response."""
@@ -80,25 +219,9 @@ class PromptOptimizer:
             # Get keywords and compressed version
             keyword_response = self.extract_keywords(
                 request.text, request.top_keywords)
-            keyword_compressed = ' '.join(keyword_response.keywords)
-
-            # Calculate compression ratios
-            original_len = len(request.text)
-            summary_len = len(summary_response.summary)
-            keyword_len = len(keyword_compressed)
-
-            return OptimizedPromptResponse(
-                original=request.text,
-                original_length=original_len,
-                summarized=summary_response.summary,
-                summary_length=summary_len,
-                keyword_based=keyword_compressed,
-                keywords_count=keyword_response.count,
-                compression_ratios={
-                    "summary": summary_len / original_len,
-                    "keywords": keyword_len / original_len
-                }
-            )
+
+            return self.build_optimized_response(
+                request, summary_response, keyword_response)
         except Exception as e:
             raise HTTPException(
                 status_code=500, detail=f"Optimization failed: {str(e)}")
@@ -0,0 +1,284 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from dto.optimize_prompt_dto import EnergySavedResponse
+from services.optimize_batch import WORKER_MP_CONTEXT, _init_worker, _optimize_chunk
+
+# Offline processing of prompt corpora:
+#
+#   python -m services.batch_process prompts.jsonl results.jsonl
+#   python -m services.batch_process prompts.csv results.parquet --resume
+#
+# Input is streamed and results are written as they complete, so memory
+# stays constant. Progress is checkpointed next to the output; --resume
+# continues after the last checkpointed record.
+
+
+def read_records(path: str, text_field: str = "text", skip: int = 0) -> Iterator[Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]]:
+    """
+    Stream (text, model_name, region, error) tuples from a JSONL or CSV file.
+
+    Blank JSONL lines are skipped; unparsable records yield an error so
+    record offsets stay stable across runs. The first `skip` records are
+    passed over without being parsed.
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in islice(csv.DictReader(f), skip, None):
+                yield _fields(row, text_field)
+        return
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            if skip:
+                skip -= 1
+                continue
+            try:
+                yield _fields(json.loads(line), text_field)
+            except (ValueError, AttributeError) as e:
+                yield None, None, None, f"Invalid record: {e}"
+
+
+def _fields(row: dict, text_field: str):
+    text = row.get(text_field)
+    if not isinstance(text, str) or not text:
+        return None, None, None, f"Missing '{text_field}'"
+    return text, row.get("model_name") or None, row.get("region") or None, None
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+class JsonlWriter:
+    """Appends result rows to a JSONL file; resumable by byte offset."""
+
+    def __init__(self, path: str, resume_bytes: int = 0):
+        if resume_bytes and _file_size(path) < resume_bytes:
+            # truncate() would pad the gap with NUL bytes
+            raise ValueError(f"{path} is shorter than its checkpoint ({resume_bytes} bytes)")
+        mode = "r+b" if resume_bytes else "wb"
+        self.file = open(path, mode)
+        # Drop anything written after the last checkpoint
+        self.file.truncate(resume_bytes)
+        self.file.seek(resume_bytes)
+
+    def write(self, rows: List[Dict]) -> None:
+        for row in rows:
+            self.file.write(json.dumps(row).encode("utf-8") + b"\n")
+
+    def checkpoint(self) -> Dict:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return {"bytes": self.file.tell()}
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ParquetWriter:
+    """
+    Writes result rows as Parquet part files in a directory.
+
+    Each checkpoint closes the current part, so every part on disk is
+    complete; parts started after the last checkpoint are removed on resume.
+    """
+
+    def __init__(self, path: str, start_offset: int = 0):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet output needs the 'pyarrow' package") from e
+        self.pa, self.pq = pa, pq
+        self.directory = Path(path)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for part in self.directory.glob("part-*.parquet"):
+            if int(part.stem.split("-")[1]) >= start_offset:
+                part.unlink()
+        self.offset = start_offset
+        self.rows: List[Dict] = []
+        # Fixed schema so parts holding only failed rows still line up
+        self.schema = pa.schema(
+            [("index", pa.int64()), ("error", pa.string())]
+            + [(name, pa.float64() if field.annotation is float else pa.string())
+               for name, field in EnergySavedResponse.model_fields.items()])
+
+    def write(self, rows: List[Dict]) -> None:
+        self.rows.extend(rows)
+
+    def checkpoint(self) -> Dict:
+        if self.rows:
+            columns = {field: [row.get(field) for row in self.rows]
+                       for field in self.schema.names}
+            part = self.directory / f"part-{self.offset:012d}.parquet"
+            self.pq.write_table(self.pa.table(columns, schema=self.schema), part)
+            self.offset += len(self.rows)
+            self.rows = []
+        return {}
+
+    def close(self) -> None:
+        self.checkpoint()
+
+
+def _checkpoint_path(output: str) -> str:
+    return output.rstrip("/") + ".checkpoint.json"
+
+
+def _load_checkpoint(output: str) -> Dict:
+    try:
+        with open(_checkpoint_path(output)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"offset": 0}
+
+
+def _save_checkpoint(output: str, state: Dict) -> None:
+    # Write then rename so a crash never leaves a torn checkpoint
+    path = _checkpoint_path(output)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+
+def process(input_path: str, output_path: str, model_name: str = "gpt-4",
+            text_field: str = "text", workers: Optional[int] = None,
+            chunk_size: int = 256, checkpoint_every: int = 10000,
+            resume: bool = False, start_offset: Optional[int] = None,
+            limit: Optional[int] = None) -> Dict:
+    """
+    Optimize every prompt of a corpus and write the results in input order.
+
+    Args:
+        input_path: JSONL or CSV file with a text column
+        output_path: .jsonl file or .parquet directory
+        model_name: Model used for records without a model_name
+        text_field: Name of the text column
+        workers: Worker processes (default: CPU count)
+        chunk_size: Records sent to a worker per task
+        checkpoint_every: Records between checkpoints
+        resume: Continue from the output's checkpoint
+        start_offset: Explicit record offset to start from (overrides resume)
+        limit: Stop after this many records
+
+    Returns:
+        Summary counts of the run
+    """
+    checkpoint = _load_checkpoint(output_path) if resume else {"offset": 0}
+    if start_offset is not None:
+        checkpoint = {"offset": start_offset}
+
+    parquet = output_path.endswith(".parquet")
+    if not parquet and checkpoint.get("bytes", 0) > _file_size(output_path):
+        # The output was deleted or replaced since the checkpoint was saved
+        print(f"Warning: {output_path} is missing or shorter than its checkpoint, "
+              f"starting over from the first record")
+        checkpoint = {"offset": 0}
+    offset = checkpoint["offset"]
+
+    writer = (ParquetWriter(output_path, offset) if parquet
+              else JsonlWriter(output_path, checkpoint.get("bytes", 0)))
+
+    records = islice(read_records(input_path, text_field, skip=offset), limit)
+    workers = workers or os.cpu_count() or 1
+    succeeded = failed = 0
+    since_checkpoint = 0
+    started = time.perf_counter()
+
+    def chunks():
+        index = offset
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                return
+            yield index, chunk
+            index += len(chunk)
+
+    def rows_for(index, chunk, future):
+        # Records that failed to parse never reach a worker
+        results = {i: (None, error) for i, (_, _, _, error) in enumerate(chunk, index) if error}
+        for i, result, error in future.result():
+            results[i] = (result, error)
+        for i in range(index, index + len(chunk)):
+            result, error = results[i]
+            yield {"index": i, "error": error, **(result or {})}
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=WORKER_MP_CONTEXT,
+                             initializer=_init_worker) as pool:
+        in_flight = deque()
+        source = chunks()
+        while True:
+            # Keep a bounded number of chunks in flight so memory stays flat
+            while len(in_flight) < 2 * workers:
+                item = next(source, None)
+                if item is None:
+                    break
+                index, chunk = item
+                tasks = [(i, text, record_model or model_name, region)
+                         for i, (text, record_model, region, error) in enumerate(chunk, index)
+                         if error is None]
+                in_flight.append((index, chunk, pool.submit(_optimize_chunk, tasks)))
+            if not in_flight:
+                break
+
+            index, chunk, future = in_flight.popleft()
+            rows = list(rows_for(index, chunk, future))
+            writer.write(rows)
+            failed += sum(1 for row in rows if row["error"])
+            succeeded += sum(1 for row in rows if not row["error"])
+            offset = index + len(chunk)
+            since_checkpoint += len(chunk)
+            if since_checkpoint >= checkpoint_every:
+                _save_checkpoint(output_path, {"offset": offset, **writer.checkpoint()})
+                since_checkpoint = 0
+                rate = (succeeded + failed) / (time.perf_counter() - started)
+                print(f"{offset} records done ({rate:.0f}/s)", file=sys.stderr)
+
+    _save_checkpoint(output_path, {"offset": offset, **writer.checkpoint()})
+    writer.close()
+    return {"offset": offset, "succeeded": succeeded, "failed": failed,
+            "seconds": round(time.perf_counter() - started, 1)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Optimize a JSONL/CSV corpus of prompts offline.")
+    parser.add_argument("input", help="JSONL or CSV file of prompts")
+    parser.add_argument("output", help="Output .jsonl file or .parquet directory")
+    parser.add_argument("--model", default="gpt-4",
+                        help="Model for records without model_name (default: gpt-4)")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--checkpoint-every", type=int, default=10000)
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue after the last checkpoint of the output")
+    parser.add_argument("--start-offset", type=int, default=None,
+                        help="Start at this record offset with a fresh output")
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    summary = process(
+        args.input, args.output, model_name=args.model,
+        text_field=args.text_field, workers=args.workers,
+        chunk_size=args.chunk_size, checkpoint_every=args.checkpoint_every,
+        resume=args.resume, start_offset=args.start_offset, limit=args.limit)
+    print(json.dumps(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
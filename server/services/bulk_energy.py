@@ -0,0 +1,176 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from dto.energy_dto import PromptEnergyResponse
+from services.energy_registry import EnergyRegistry, energy_registry
+from services.energy_calculation import TokenEnergyCalculator
+
+# A single value, one value per row, or a (names, codes) dictionary encoding
+Column = Union[str, Sequence[str], np.ndarray, Tuple[Sequence[str], np.ndarray]]
+
+
+@dataclass(frozen=True)
+class BulkEnergyEstimate:
+    """
+    Columnar energy and CO2 estimates for many prompts.
+
+    Model and region columns are dictionary encoded: `model_codes[i]`
+    indexes `model_names`. Values are not rounded, so column sums stay
+    exact; per-row objects round like TokenEnergyCalculator.analyze_prompt.
+    """
+    tokens: np.ndarray
+    model_names: List[str]
+    model_codes: np.ndarray
+    region_names: List[str]
+    region_codes: np.ndarray
+    energy_wh: np.ndarray
+    energy_mwh: np.ndarray
+    co2_grams: np.ndarray
+    registry_version: str
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def totals(self) -> Dict[str, float]:
+        return {
+            "tokens": int(self.tokens.sum()),
+            "energy_wh": float(self.energy_wh.sum()),
+            "energy_mwh": float(self.energy_mwh.sum()),
+            "co2_grams": float(self.co2_grams.sum()),
+        }
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Plain NumPy columns, with model and region decoded to strings."""
+        return {
+            "tokens": self.tokens,
+            "model": np.asarray(self.model_names, dtype=object)[self.model_codes],
+            "region": np.asarray(self.region_names, dtype=object)[self.region_codes],
+            "energy_wh": self.energy_wh,
+            "energy_mwh": self.energy_mwh,
+            "co2_grams": self.co2_grams,
+        }
+
+    def to_arrow(self):
+        """
+        Arrow table sharing the NumPy buffers (requires pyarrow).
+
+        Model and region become dictionary arrays, so the strings are
+        stored once rather than once per row.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise RuntimeError("to_arrow needs the 'pyarrow' package") from e
+        table = pa.table({
+            "tokens": self.tokens,
+            "model": pa.DictionaryArray.from_arrays(self.model_codes, self.model_names),
+            "region": pa.DictionaryArray.from_arrays(self.region_codes, self.region_names),
+            "energy_wh": self.energy_wh,
+            "energy_mwh": self.energy_mwh,
+            "co2_grams": self.co2_grams,
+        })
+        return table.replace_schema_metadata({"registry_version": self.registry_version})
+
+    def to_records(self) -> List[PromptEnergyResponse]:
+        """Per-row response objects; only build these for small results."""
+        return [
+            PromptEnergyResponse(
+                tokens=int(tokens),
+                model=self.model_names[model],
+                energy_wh=round(float(wh), 6),
+                energy_mwh=round(float(mwh), 3),
+                co2_grams=round(float(co2), 6),
+                region=self.region_names[region],
+                registry_version=self.registry_version,
+            )
+            for tokens, model, region, wh, mwh, co2 in zip(
+                self.tokens, self.model_codes, self.region_codes,
+                self.energy_wh, self.energy_mwh, self.co2_grams)
+        ]
+
+
+def _encode(values: Optional[Column], size: int, default: str):
+    """Dictionary encode a scalar-or-column argument into (names, codes)."""
+    if values is None or isinstance(values, str):
+        return [values or default], np.zeros(size, dtype=np.int32)
+    if isinstance(values, tuple):
+        # Already dictionary encoded, e.g. from an Arrow or pandas category
+        names, codes = values
+        names, codes = [name or default for name in names], np.asarray(codes, dtype=np.int32)
+    else:
+        values = np.asarray(values)
+        if values.dtype == object:
+            values = np.where(values == None, default, values).astype(str)  # noqa: E711
+        names, codes = np.unique(values, return_inverse=True)
+        names, codes = names.tolist(), codes.astype(np.int32)
+    if len(codes) != size:
+        raise ValueError(f"Expected {size} values, got {len(codes)}")
+    if size and (codes.min() < 0 or codes.max() >= len(names)):
+        raise ValueError("Dictionary codes out of range")
+    return names, codes
+
+
+def estimate_bulk(token_counts: Optional[Sequence[int]] = None,
+                  texts: Optional[Sequence[str]] = None,
+                  models: Column = "gpt-4",
+                  regions: Optional[Column] = None,
+                  registry: Optional[EnergyRegistry] = None,
+                  calculator: Optional[TokenEnergyCalculator] = None) -> BulkEnergyEstimate:
+    """
+    Estimate energy and CO2 for many prompts with array operations.
+
+    Coefficients are looked up once per distinct model and region and then
+    broadcast over the rows, so the cost per row is a few vector operations.
+
+    Args:
+        token_counts: Token count of each prompt
+        texts: Prompt texts, tokenized per model in batches (if no counts)
+        models: One model name, one per prompt, or a (names, codes) pair
+        regions: Like models; None means the default region
+        registry: Registry snapshot (default: the current one)
+        calculator: Tokenizes `texts` (default: a new calculator)
+
+    Returns:
+        BulkEnergyEstimate: Columnar results
+
+    Raises:
+        ValueError: If neither or both of token_counts and texts are given,
+            or a column has the wrong length or invalid codes
+    """
+    if (token_counts is None) == (texts is None):
+        raise ValueError("Pass exactly one of token_counts or texts")
+    registry = registry or energy_registry.current()
+    size = len(token_counts if token_counts is not None else texts)
+
+    model_names, model_codes = _encode(models, size, registry.default_model)
+    region_names, region_codes = _encode(regions, size, registry.default_region)
+
+    if token_counts is not None:
+        tokens = np.asarray(token_counts, dtype=np.int64)
+    else:
+        calculator = calculator or TokenEnergyCalculator()
+        tokens = np.empty(size, dtype=np.int64)
+        texts = np.asarray(texts, dtype=object)
+        for code, model in enumerate(model_names):
+            rows = np.flatnonzero(model_codes == code)
+            tokens[rows] = calculator.count_tokens_batch(
+                texts[rows].tolist(), model, registry)
+
+    wh_per_1k = np.array([registry.model(m).input_wh_per_1k for m in model_names])
+    g_per_kwh = np.array([registry.carbon_intensity(r) for r in region_names])
+    # Unknown regions report the region they fell back to, like analyze_prompt
+    region_names = [registry.resolve_region(r) for r in region_names]
+
+    energy_wh = tokens / 1000 * wh_per_1k[model_codes]
+    co2_grams = energy_wh / 1000 * g_per_kwh[region_codes]
+    return BulkEnergyEstimate(
+        tokens=tokens,
+        model_names=model_names,
+        model_codes=model_codes,
+        region_names=region_names,
+        region_codes=region_codes,
+        energy_wh=energy_wh,
+        energy_mwh=energy_wh * 1000,
+        co2_grams=co2_grams,
+        registry_version=registry.version,
+    )
@@ -0,0 +1,103 @@
+import re
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+# Matches patterns of the form r'\bsome phrase\b' that contain no regex
+# syntax other than escaped apostrophes, so they can be folded into the trie.
+_LITERAL_PATTERN = re.compile(r"^\\b((?:[a-z0-9 ]|\\')+)\\b$")
+
+
+class ClauseMatcher:
+    """
+    Single-pass matcher for request clauses.
+
+    Literal phrase patterns are merged into a character trie that is compiled
+    into one regular expression, so the cost of a scan depends on the text
+    and not on how many phrases are registered. Patterns that use other regex
+    syntax are appended to the same alternation unchanged.
+
+    At every position the longest phrase wins, and matches never overlap, so
+    the reported spans are exactly the spans that get removed.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Build the combined expression.
+
+        Args:
+            patterns: Clause patterns as written in PromptOptimizer.request_clauses
+        """
+        trie = {}
+        raw_patterns = []
+        for pattern in patterns:
+            literal = _LITERAL_PATTERN.match(pattern)
+            if literal:
+                self._insert(trie, literal.group(1).replace("\\'", "'"))
+            elif pattern not in raw_patterns:
+                raw_patterns.append(pattern)
+
+        alternatives = []
+        if trie:
+            alternatives.append(r'\b' + self._trie_to_regex(trie))
+        alternatives.extend(raw_patterns)
+        self.pattern = re.compile('|'.join(alternatives) or r'(?!)',
+                                  re.IGNORECASE)
+
+    @staticmethod
+    def _insert(trie: dict, phrase: str) -> None:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    @classmethod
+    def _trie_to_regex(cls, node: dict) -> str:
+        # Longer continuations are tried before the terminal word boundary,
+        # which gives leftmost-longest matching. Sibling branches start with
+        # different characters, so at most one of them can match.
+        branches = [re.escape(char) + cls._trie_to_regex(child)
+                    for char, child in sorted(node.items()) if char]
+        if '' in node:
+            branches.append(r'\b')
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+
+    def find_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Find all clause spans in one left-to-right scan.
+
+        Args:
+            text: The text to scan
+
+        Returns:
+            List of non-overlapping (start, end) offsets
+        """
+        return [match.span() for match in self.pattern.finditer(text)
+                if match.end() > match.start()]
+
+    def remove(self, text: str) -> Tuple[str, List[str]]:
+        """
+        Remove every clause from the text.
+
+        Args:
+            text: The text to clean
+
+        Returns:
+            Tuple of (text with clauses removed, lowercased removed clauses)
+        """
+        pieces = []
+        removed = []
+        last = 0
+        for start, end in self.find_spans(text):
+            pieces.append(text[last:start])
+            removed.append(text[start:end].lower())
+            last = end
+        pieces.append(text[last:])
+        return ''.join(pieces), removed
+
+
+@lru_cache(maxsize=8)
+def get_clause_matcher(patterns: Tuple[str, ...]) -> ClauseMatcher:
+    """Return a compiled matcher, building it only once per pattern set."""
+    return ClauseMatcher(patterns)
@@ -1,90 +1,173 @@
 import tiktoken
 import math
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional
 from dto.energy_dto import PromptEnergyResponse
+from services.energy_registry import EnergyRegistry, EnergyRegistrySource, energy_registry
+from services.nltk_resources import register_tiktoken_cache_dir
+
+# Encodings are pre-fetched by `python -m services.nltk_resources`
+register_tiktoken_cache_dir()
+
+
+# Model names come from clients, so the cache is bounded; the warning is
+# printed once per name while it stays cached
+@lru_cache(maxsize=256)
+def _encoding_name(model_name: str) -> str:
+    try:
+        return tiktoken.encoding_name_for_model(model_name)
+    except KeyError:
+        # Fallback to cl100k_base encoding (used by GPT-4)
+        print(f"Warning: Model {model_name} not found, using cl100k_base encoding")
+        return "cl100k_base"
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(encoding_name: str) -> tiktoken.Encoding:
+    return tiktoken.get_encoding(encoding_name)
+
+
+def get_tokenizer(model_name: str, registry: Optional[EnergyRegistry] = None) -> tiktoken.Encoding:
+    """
+    Return the tiktoken encoding for a model.
+
+    The registry's tokenizer mapping wins; other models are resolved to
+    their encoding family once. Each encoding is built once per process and
+    shared by every model that uses it.
+    """
+    coefficients = registry.models.get(model_name) if registry is not None else None
+    if coefficients is not None and coefficients.tokenizer:
+        return _get_encoding(coefficients.tokenizer)
+    return _get_encoding(_encoding_name(model_name))
+
 
 class TokenEnergyCalculator:
     """
     A class to calculate token count and energy cost for processing prompts.
     """
 
-    def __init__(self, model_name: str = "gpt-4"):
+    def __init__(self, model_name: str = "gpt-4",
+                 registry_source: EnergyRegistrySource = energy_registry):
         """
         Initialize the calculator with a specific model.
 
         Args:
             model_name: The model to use for tokenization (default: "gpt-4")
+            registry_source: Source of the energy coefficients and carbon
+                intensities (default: the shared, hot-reloaded registry)
         """
         self.model_name = model_name
-        try:
-            self.tokenizer = tiktoken.encoding_for_model(model_name)
-        except KeyError:
-            # Fallback to cl100k_base encoding (used by GPT-4)
-            print(
-                f"Warning: Model {model_name} not found, using cl100k_base encoding")
-            self.tokenizer = tiktoken.get_encoding("cl100k_base")
-
-        # Energy cost estimates (in Wh per 1000 tokens)
-        # These are rough estimates based on research and may vary
-        self.energy_costs = {
-            "gpt-3.5-turbo": 0.002,  # 2 mWh per 1000 tokens
-            "gpt-4": 0.008,          # 8 mWh per 1000 tokens
-            "gpt-4-turbo": 0.006,    # 6 mWh per 1000 tokens
-            "claude-3-sonnet": 0.005,  # 5 mWh per 1000 tokens
-            "claude-3-opus": 0.012,   # 12 mWh per 1000 tokens
-            "claude-4-sonnet": 0.005,  # 5 mWh per 1000 tokens (estimated)
-            "default": 0.005         # Default estimate
-        }
-
-    def count_tokens(self, text: str) -> int:
+        self.registry_source = registry_source
+        self.tokenizer = get_tokenizer(model_name, registry_source.current())
+
+    def count_tokens(self, text: str, model: Optional[str] = None,
+                     registry: Optional[EnergyRegistry] = None) -> int:
         """
         Count the number of tokens in the given text.
 
         Args:
             text: The input text to tokenize
+            model: Model whose tokenizer is used (default: the calculator's model)
+            registry: Registry snapshot holding the tokenizer mapping (optional)
 
         Returns:
             int: Number of tokens in the text
         """
+        tokenizer = get_tokenizer(model or self.model_name,
+                                  registry or self.registry_source.current())
         try:
-            tokens = self.tokenizer.encode(text)
+            tokens = tokenizer.encode(text)
             return len(tokens)
         except Exception as e:
             print(f"Error tokenizing text: {e}")
             # Fallback: rough estimate of 4 characters per token
             return math.ceil(len(text) / 4)
 
-    def analyze_prompt(self, prompt: str, model: Optional[str] = None) -> PromptEnergyResponse:
+    def count_tokens_batch(self, texts: List[str], model: Optional[str] = None,
+                           registry: Optional[EnergyRegistry] = None) -> List[int]:
         """
-        Analyze a prompt to get token count, energy cost, and carbon emissions.
+        Count the tokens of many texts in one batched tokenizer call.
 
         Args:
-            prompt: The prompt text to analyze
-            model: Model name (optional)
+            texts: The input texts to tokenize
+            model: Model whose tokenizer is used (default: the calculator's model)
+            registry: Registry snapshot holding the tokenizer mapping (optional)
 
         Returns:
-            PromptEnergyResponse: Energy cost and carbon emissions information
+            List[int]: Number of tokens of each text, in order
         """
-        if model is None:
-            model = self.model_name
+        registry = registry or self.registry_source.current()
+        tokenizer = get_tokenizer(model or self.model_name, registry)
+        try:
+            return [len(tokens) for tokens in tokenizer.encode_batch(texts)]
+        except Exception:
+            # One bad text fails the whole batch; count them one by one
+            return [self.count_tokens(text, model, registry) for text in texts]
+
+    @staticmethod
+    def _energy_response(token_count: int, model: str, region: Optional[str],
+                         registry: EnergyRegistry) -> PromptEnergyResponse:
+        # Prompts are model input, so the input coefficient applies
+        cost_per_1k = registry.model(model).input_wh_per_1k
 
-        # Count tokens
-        token_count = self.count_tokens(prompt)
-        
-        # Get energy cost per 1000 tokens
-        cost_per_1k = self.energy_costs.get(model, self.energy_costs["default"])
-        
         # Calculate total energy cost in Wh
         energy_wh = (token_count / 1000) * cost_per_1k
         energy_mwh = energy_wh * 1000  # Convert to mWh
-        
-        # Estimate CO2 emissions (using global average of ~0.5 kg CO2/kWh)
-        co2_grams = (energy_wh / 1000) * 500  # Convert to grams of CO2
+
+        # Estimate CO2 emissions from the region's grid carbon intensity (g/kWh)
+        co2_grams = (energy_wh / 1000) * registry.carbon_intensity(region)
 
         return PromptEnergyResponse(
             tokens=token_count,
             model=model,
             energy_wh=round(energy_wh, 6),
             energy_mwh=round(energy_mwh, 3),
-            co2_grams=round(co2_grams, 6)
+            co2_grams=round(co2_grams, 6),
+            region=registry.resolve_region(region),
+            registry_version=registry.version
         )
+
+    def analyze_prompt(self, prompt: str, model: Optional[str] = None,
+                       region: Optional[str] = None,
+                       registry: Optional[EnergyRegistry] = None) -> PromptEnergyResponse:
+        """
+        Analyze a prompt to get token count, energy cost, and carbon emissions.
+
+        Args:
+            prompt: The prompt text to analyze
+            model: Model name (optional)
+            region: Grid region for the carbon intensity (optional)
+            registry: Registry snapshot to use (default: the current one)
+
+        Returns:
+            PromptEnergyResponse: Energy cost and carbon emissions information
+        """
+        if model is None:
+            model = self.model_name
+        registry = registry or self.registry_source.current()
+
+        return self._energy_response(
+            self.count_tokens(prompt, model, registry), model, region, registry)
+
+    def analyze_prompts(self, prompts: List[str], model: Optional[str] = None,
+                        region: Optional[str] = None,
+                        registry: Optional[EnergyRegistry] = None) -> List[PromptEnergyResponse]:
+        """
+        Analyze many prompts for the same model with one batched tokenizer call.
+
+        Args:
+            prompts: The prompt texts to analyze
+            model: Model name (optional)
+            region: Grid region for the carbon intensity (optional)
+            registry: Registry snapshot to use (default: the current one)
+
+        Returns:
+            List[PromptEnergyResponse]: One result per prompt, all computed
+            with the same registry version
+        """
+        if model is None:
+            model = self.model_name
+        registry = registry or self.registry_source.current()
+
+        return [self._energy_response(token_count, model, region, registry)
+                for token_count in self.count_tokens_batch(prompts, model, registry)]
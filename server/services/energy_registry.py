@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+# Data file with the per-model coefficients and regional carbon intensity
+ENERGY_REGISTRY_PATH = os.environ.get(
+    "ENERGY_REGISTRY_PATH",
+    str(Path(__file__).resolve().parent.parent / "data" / "energy_models.json")
+)
+
+
+@dataclass(frozen=True)
+class ModelCoefficients:
+    """Energy coefficients of one model, in Wh per 1000 tokens."""
+    input_wh_per_1k: float
+    output_wh_per_1k: float
+    # tiktoken encoding name; None lets tiktoken resolve it from the model name
+    tokenizer: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class EnergyRegistry:
+    """
+    Immutable snapshot of the energy model registry.
+
+    A calculation uses one snapshot throughout, so every figure in a
+    response comes from the same registry version even if the file is
+    reloaded meanwhile.
+    """
+    version: str
+    models: Mapping[str, ModelCoefficients]
+    # g CO2 per kWh
+    regions: Mapping[str, float]
+    default_model: str
+    default_region: str
+
+    def model(self, name: str) -> ModelCoefficients:
+        return self.models.get(name) or self.models[self.default_model]
+
+    def resolve_region(self, region: Optional[str]) -> str:
+        region = (region or self.default_region).lower()
+        return region if region in self.regions else self.default_region
+
+    def carbon_intensity(self, region: Optional[str]) -> float:
+        return self.regions[self.resolve_region(region)]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "EnergyRegistry":
+        """
+        Build and validate a registry from its parsed data file.
+
+        Raises:
+            ValueError: If the data is incomplete or inconsistent
+        """
+        try:
+            models = {
+                name: ModelCoefficients(
+                    input_wh_per_1k=float(entry["input_wh_per_1k"]),
+                    output_wh_per_1k=float(entry.get("output_wh_per_1k", entry["input_wh_per_1k"])),
+                    tokenizer=entry.get("tokenizer"),
+                )
+                for name, entry in data["models"].items()
+            }
+            regions = {name.lower(): float(value) for name, value in data["regions"].items()}
+            registry = cls(
+                version=str(data["version"]),
+                models=MappingProxyType(models),
+                regions=MappingProxyType(regions),
+                default_model=data.get("default_model", "default"),
+                default_region=data.get("default_region", "global").lower(),
+            )
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"Invalid energy registry: {e!r}") from e
+        if registry.default_model not in registry.models:
+            raise ValueError(f"Default model '{registry.default_model}' is not in the registry")
+        if registry.default_region not in registry.regions:
+            raise ValueError(f"Default region '{registry.default_region}' is not in the registry")
+        return registry
+
+    @classmethod
+    def from_file(cls, path: str) -> "EnergyRegistry":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+class EnergyRegistrySource:
+    """
+    Serves the current registry snapshot and reloads it when the file changes.
+
+    The file's modification time is checked at most every `check_interval`
+    seconds, so workers pick up edits without a restart. A file that fails
+    to load or validate is ignored and the previous snapshot stays active.
+    """
+
+    def __init__(self, path: str = ENERGY_REGISTRY_PATH, check_interval: float = 5.0):
+        """
+        Load the registry.
+
+        Args:
+            path: Registry data file
+            check_interval: Minimum seconds between modification checks
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.mtime = os.stat(path).st_mtime_ns
+        self.registry = EnergyRegistry.from_file(path)
+        self.next_check = time.monotonic() + check_interval
+        self.reloads = 0
+
+    def current(self) -> EnergyRegistry:
+        """Return the current snapshot, reloading it first if the file changed."""
+        if time.monotonic() >= self.next_check:
+            self._reload_if_changed()
+        return self.registry
+
+    def _reload_if_changed(self) -> None:
+        # Only one thread checks; the others keep using the current snapshot
+        if not self.lock.acquire(blocking=False):
+            return
+        try:
+            self.next_check = time.monotonic() + self.check_interval
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if mtime == self.mtime:
+                    return
+                registry = EnergyRegistry.from_file(self.path)
+            except (OSError, ValueError) as e:
+                print(f"Warning: keeping energy registry {self.registry.version}, reload failed: {e}")
+                return
+            self.mtime = mtime
+            self.registry = registry
+            self.reloads += 1
+        finally:
+            self.lock.release()
+
+
+energy_registry = EnergyRegistrySource(
+    check_interval=float(os.environ.get("ENERGY_REGISTRY_CHECK_INTERVAL", "5")))
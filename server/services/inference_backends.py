@@ -0,0 +1,326 @@
+import argparse
+import os
+import resource
+import shutil
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+SUMMARY_MODEL = "sshleifer/distilbart-cnn-12-6"
+EMBEDDING_MODEL = "sentence-transformers/distilbert-base-nli-mean-tokens"
+
+# pytorch: full precision (reference quality)
+# int8:    PyTorch dynamic quantization of every Linear layer, no extra deps
+# onnx:    ONNX Runtime with dynamically int8-quantized graphs, needs
+#          `pip install optimum[onnxruntime]`
+INFERENCE_BACKENDS = ("pytorch", "int8", "onnx")
+
+# Exported and quantized ONNX graphs are cached here between runs
+ONNX_MODEL_DIR = os.environ.get(
+    "ONNX_MODEL_DIR",
+    str(Path(__file__).resolve().parent.parent / "onnx_models")
+)
+
+
+def _check_backend(backend: str) -> None:
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(
+            f"Unknown inference backend '{backend}', "
+            f"expected one of {', '.join(INFERENCE_BACKENDS)}")
+
+
+def _quantize_dynamic(model):
+    import torch
+
+    return torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _import_optimum():
+    try:
+        from optimum.onnxruntime import (
+            ORTModelForSeq2SeqLM, ORTQuantizer)
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    except ImportError as e:
+        raise RuntimeError(
+            "The onnx inference backend needs the 'optimum[onnxruntime]' "
+            "package") from e
+    return ORTModelForSeq2SeqLM, ORTQuantizer, AutoQuantizationConfig
+
+
+def _export_atomically(path: Path, export: Callable[[Path], None],
+                       ready: Callable[[Path], bool]) -> None:
+    """
+    Export into a temporary directory next to `path`, then move it into place.
+
+    Workers sharing ONNX_MODEL_DIR never see a half-written export; if
+    several export at once, the first complete one to be published wins.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Same filesystem as the target, so the final rename is atomic
+    build_path = Path(tempfile.mkdtemp(prefix=f".{path.name}-", dir=path.parent))
+    try:
+        export(build_path)
+    except BaseException:
+        shutil.rmtree(build_path, ignore_errors=True)
+        raise
+    if ready(path):
+        # Another process published while we were exporting
+        shutil.rmtree(build_path, ignore_errors=True)
+        return
+    build_path.chmod(0o755)
+
+    # A directory can't be renamed over a non-empty one, so move an
+    # incomplete export (e.g. from an interrupted older version) aside first
+    previous = None
+    if path.exists():
+        previous = Path(tempfile.mkdtemp(prefix=f".{path.name}-old-", dir=path.parent))
+        os.replace(path, previous / path.name)
+    try:
+        os.replace(build_path, path)
+    except OSError:
+        # Lost the race against a concurrent publisher
+        shutil.rmtree(build_path, ignore_errors=True)
+        if not ready(path):
+            raise
+    if previous is not None:
+        shutil.rmtree(previous, ignore_errors=True)
+
+
+def _onnx_summary_model(model_name: str, model_dir: str):
+    ORTModelForSeq2SeqLM, ORTQuantizer, AutoQuantizationConfig = _import_optimum()
+
+    path = Path(model_dir) / model_name.replace("/", "--")
+    graphs = ("encoder_model", "decoder_model", "decoder_with_past_model")
+    quantized = {name: f"{name}_quantized.onnx" for name in graphs}
+
+    def ready(target: Path) -> bool:
+        return all((target / file_name).exists() for file_name in quantized.values())
+
+    def export(build_path: Path) -> None:
+        # Export once, then quantize each graph's weights to int8
+        ORTModelForSeq2SeqLM.from_pretrained(
+            model_name, export=True, use_merged=False).save_pretrained(build_path)
+        config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        for name in graphs:
+            quantizer = ORTQuantizer.from_pretrained(build_path, file_name=f"{name}.onnx")
+            quantizer.quantize(save_dir=build_path, quantization_config=config)
+
+    if not ready(path):
+        _export_atomically(path, export, ready)
+
+    return ORTModelForSeq2SeqLM.from_pretrained(
+        path,
+        encoder_file_name=quantized["encoder_model"],
+        decoder_file_name=quantized["decoder_model"],
+        decoder_with_past_file_name=quantized["decoder_with_past_model"],
+    )
+
+
+def load_summarizer(backend: str = "pytorch", model_name: str = SUMMARY_MODEL,
+                    model_dir: str = ONNX_MODEL_DIR):
+    """
+    Build the summarization pipeline for an inference backend.
+
+    Args:
+        backend: One of INFERENCE_BACKENDS
+        model_name: Hugging Face model id
+        model_dir: Cache directory for exported ONNX graphs
+
+    Returns:
+        A transformers summarization pipeline
+    """
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+
+    _check_backend(backend)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    if backend == "onnx":
+        model = _onnx_summary_model(model_name, model_dir)
+    else:
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name).eval()
+        if backend == "int8":
+            model = _quantize_dynamic(model)
+    return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+
+def load_embedding_model(backend: str = "pytorch",
+                         model_name: str = EMBEDDING_MODEL,
+                         model_dir: str = ONNX_MODEL_DIR):
+    """
+    Build the sentence embedding model KeyBERT runs on.
+
+    Args:
+        backend: One of INFERENCE_BACKENDS
+        model_name: Sentence-transformers model id
+        model_dir: Cache directory for exported ONNX graphs
+
+    Returns:
+        A SentenceTransformer instance
+    """
+    from sentence_transformers import SentenceTransformer
+
+    _check_backend(backend)
+    if backend == "onnx":
+        _import_optimum()
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+
+        path = Path(model_dir) / model_name.replace("/", "--")
+        file_name = "onnx/model_qint8_avx2.onnx"
+
+        def export(build_path: Path) -> None:
+            model = SentenceTransformer(model_name, backend="onnx", device="cpu")
+            model.save_pretrained(str(build_path))
+            export_dynamic_quantized_onnx_model(model, "avx2", str(build_path))
+
+        if not (path / file_name).exists():
+            _export_atomically(path, export, lambda target: (target / file_name).exists())
+        return SentenceTransformer(
+            str(path), backend="onnx", device="cpu",
+            model_kwargs={"file_name": file_name})
+
+    model = SentenceTransformer(model_name, device="cpu")
+    if backend == "int8":
+        model = _quantize_dynamic(model)
+    return model
+
+
+BENCHMARK_PROMPTS = [
+    "Can you please help me write a short summary of the quarterly sales report, "
+    "focusing on the regions where revenue declined and the main reasons given by "
+    "the regional managers for the decline?",
+    "I would like you to explain, in simple terms that a high school student could "
+    "understand, how photosynthesis converts sunlight, water and carbon dioxide "
+    "into glucose and oxygen inside plant cells.",
+    "Could you write a polite email to my landlord asking whether the broken "
+    "heating in the apartment can be repaired before the end of the week, since "
+    "the temperatures are dropping and my children are getting sick?",
+    "Please review the following Python function for performance problems and "
+    "suggest how to avoid repeatedly loading the configuration file inside the "
+    "loop that processes every uploaded customer record.",
+    "I need a detailed comparison of renewable energy sources, including solar, "
+    "wind, hydroelectric and geothermal power, covering their cost per megawatt "
+    "hour, reliability, land use and environmental impact.",
+    "Would you be able to generate a weekly meal plan for a vegetarian family of "
+    "four that keeps the grocery budget under one hundred dollars and avoids "
+    "recipes that take longer than thirty minutes to cook?",
+    "Help me prepare for a job interview as a data analyst by listing the most "
+    "common technical questions about SQL joins, window functions and data "
+    "cleaning, along with concise model answers.",
+    "Summarize the main arguments for and against a four day work week, drawing "
+    "on the results of recent trials in the United Kingdom, Iceland and New "
+    "Zealand and their effects on productivity and wellbeing.",
+]
+
+
+def _rouge_l(candidate: str, reference: str) -> float:
+    """ROUGE-L F1 over lowercase whitespace tokens."""
+    a, b = candidate.lower().split(), reference.lower().split()
+    if not a or not b:
+        return 0.0
+    previous = [0] * (len(b) + 1)
+    for token in a:
+        current = [0]
+        for j, other in enumerate(b):
+            current.append(previous[j] + 1 if token == other
+                           else max(previous[j + 1], current[j]))
+        previous = current
+    lcs = previous[-1]
+    if lcs == 0:
+        return 0.0
+    precision, recall = lcs / len(a), lcs / len(b)
+    return 2 * precision * recall / (precision + recall)
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is reported in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def benchmark_backend(backend: str, max_length: int = 50, min_length: int = 20,
+                      rounds: int = 3) -> Dict:
+    """
+    Time both models of one backend on the fixed prompt corpus.
+
+    Returns:
+        Load time, latency percentiles, peak RSS and raw outputs
+    """
+    start = time.perf_counter()
+    summarizer = load_summarizer(backend)
+    embedder = load_embedding_model(backend)
+    load_s = time.perf_counter() - start
+
+    summaries = []
+    summary_ms = []
+    for _ in range(rounds):
+        summaries = []
+        for prompt in BENCHMARK_PROMPTS:
+            start = time.perf_counter()
+            output = summarizer(prompt, max_length=max_length,
+                                min_length=min_length, do_sample=False)
+            summary_ms.append((time.perf_counter() - start) * 1000)
+            summaries.append(output[0]["summary_text"])
+
+    embed_ms = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        embeddings = embedder.encode(BENCHMARK_PROMPTS, normalize_embeddings=True)
+        embed_ms.append((time.perf_counter() - start) * 1000 / len(BENCHMARK_PROMPTS))
+
+    return {
+        "backend": backend,
+        "load_s": load_s,
+        "summary_ms_p50": statistics.median(summary_ms),
+        "summary_ms_p95": sorted(summary_ms)[int(0.95 * (len(summary_ms) - 1))],
+        "embed_ms_per_prompt": statistics.median(embed_ms),
+        "peak_rss_mb": _rss_mb(),
+        "summaries": summaries,
+        "embeddings": embeddings,
+    }
+
+
+def compare_backends(backends: List[str], rounds: int = 3) -> None:
+    """
+    Compare speed and quality of backends against full-precision PyTorch.
+
+    Quality is the mean ROUGE-L F1 of each summary against the reference
+    summary and the mean cosine similarity of the prompt embeddings. Each
+    backend runs in a fresh process so peak RSS figures are comparable.
+    """
+    import numpy as np
+
+    results = []
+    for backend in ["pytorch"] + [b for b in backends if b != "pytorch"]:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results.append(pool.submit(benchmark_backend, backend, rounds=rounds).result())
+    reference = results[0]
+
+    print(f"{'backend':>8} {'load s':>7} {'sum p50':>8} {'sum p95':>8} "
+          f"{'emb ms':>7} {'rss MB':>7} {'rouge-L':>8} {'cosine':>7}")
+    for result in results:
+        rouge = statistics.mean(
+            _rouge_l(s, r) for s, r in zip(result["summaries"], reference["summaries"]))
+        cosine = float(np.mean(np.sum(
+            result["embeddings"] * reference["embeddings"], axis=1)))
+        print(f"{result['backend']:>8} {result['load_s']:7.1f} "
+              f"{result['summary_ms_p50']:8.1f} {result['summary_ms_p95']:8.1f} "
+              f"{result['embed_ms_per_prompt']:7.2f} {result['peak_rss_mb']:7.0f} "
+              f"{rouge:8.3f} {cosine:7.4f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare quality and speed of the AI inference backends.")
+    parser.add_argument("--backends", nargs="+", choices=INFERENCE_BACKENDS,
+                        default=list(INFERENCE_BACKENDS))
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    compare_backends(args.backends, args.rounds)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
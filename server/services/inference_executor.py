@@ -0,0 +1,94 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+from fastapi import HTTPException
+
+
+class InferenceExecutor:
+    """
+    Runs blocking model inference off the event loop with back-pressure.
+
+    At most `max_concurrency` calls execute at once on a dedicated thread
+    pool and at most `max_queue` more wait for a slot. Calls beyond that are
+    rejected immediately with 503 so the worker stays responsive.
+    """
+
+    def __init__(self, max_concurrency: int = 2, max_queue: int = 16,
+                 retry_after: int = 1):
+        """
+        Initialize the executor.
+
+        Args:
+            max_concurrency: Number of inference calls allowed to run at once
+            max_queue: Number of calls allowed to wait for a free slot
+            retry_after: Seconds suggested to rejected clients
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="inference")
+        # Only touched from the event loop thread, so no lock is needed
+        self.pending = 0
+
+    @property
+    def saturated(self) -> bool:
+        return self.pending >= self.max_concurrency + self.max_queue
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking callable on the inference pool.
+
+        Args:
+            func: The blocking callable
+            *args, **kwargs: Arguments forwarded to the callable
+
+        Returns:
+            Whatever the callable returns
+
+        Raises:
+            HTTPException: 503 when the pool and its queue are full
+        """
+        return await self.submit(func, *args, **kwargs)
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> asyncio.Future:
+        """
+        Start a blocking callable on the inference pool without waiting.
+
+        Must be called from the event loop. Capacity is checked immediately,
+        so callers can reject a request before they start responding.
+
+        Returns:
+            An asyncio future resolving to the callable's result
+
+        Raises:
+            HTTPException: 503 when the pool and its queue are full
+        """
+        if self.saturated:
+            raise HTTPException(
+                status_code=503,
+                detail="Inference capacity exhausted, retry later",
+                headers={"Retry-After": str(self.retry_after)})
+
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        future = self.executor.submit(partial(func, *args, **kwargs))
+        # Release the slot when the thread finishes, not when the caller
+        # stops waiting, so disconnected clients can't oversubscribe the pool
+        future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(self._release))
+        return asyncio.wrap_future(future)
+
+    def _release(self) -> None:
+        self.pending -= 1
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+inference_executor = InferenceExecutor(
+    max_concurrency=int(os.environ.get("INFERENCE_MAX_CONCURRENCY", "2")),
+    max_queue=int(os.environ.get("INFERENCE_MAX_QUEUE", "16")),
+)
@@ -0,0 +1,153 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+from starlette.concurrency import run_in_threadpool
+from starlette.websockets import WebSocketDisconnect
+from dto.optimize_prompt_dto import EnergySavedResponse, LivePromptRevision, PromptRequest
+from services.optimize import PromptOptimizer
+from services.energy_calculation import TokenEnergyCalculator
+from services.result_cache import result_cache
+from services.optimize_batch import optimize_cache_key, energy_saved_response
+
+VARIANTS = ("conservative", "balanced", "aggressive")
+
+
+class LiveAnalysisSession:
+    """
+    Analysis state of one live (WebSocket) connection.
+
+    Revisions arriving within `debounce_ms` of each other are coalesced, and
+    a new revision cancels the analysis of the previous one, so only the
+    latest text is fully analyzed. Results are sent as separate messages:
+    the original token count and energy first, then every variant, then the
+    complete response (the same one POST /optimize returns).
+    """
+
+    def __init__(self, send: Callable[[Dict[str, Any]], Awaitable[None]],
+                 prompt_optimizer: PromptOptimizer,
+                 energy_calculator: TokenEnergyCalculator,
+                 debounce_ms: int = 150):
+        """
+        Initialize the session.
+
+        Args:
+            send: Coroutine sending one JSON message to the client
+            prompt_optimizer: Shared rule-based optimizer
+            energy_calculator: Shared energy calculator
+            debounce_ms: Quiet period before a revision is analyzed
+        """
+        self.send = send
+        self.prompt_optimizer = prompt_optimizer
+        self.energy_calculator = energy_calculator
+        self.debounce = debounce_ms / 1000
+        self.task: Optional[asyncio.Task] = None
+        self.revision = 0
+
+    def submit(self, revision: LivePromptRevision) -> None:
+        """Schedule analysis of a revision, cancelling any older one."""
+        self.revision = revision.revision if revision.revision is not None else self.revision + 1
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+        self.task = asyncio.create_task(self._run(self.revision, revision))
+
+    async def close(self) -> None:
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self, revision: int, request: LivePromptRevision) -> None:
+        try:
+            await asyncio.sleep(self.debounce)
+            cache_key = optimize_cache_key(
+                request.text, request.model_name, request.region)
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                await self._send_cached(revision, cached, request.model_name)
+                return
+            result = await self._analyze(revision, request)
+            result_cache.set(cache_key, result.model_dump())
+        except asyncio.CancelledError:
+            # A newer revision superseded this one; the worker thread of the
+            # current step finishes but its result is dropped.
+            raise
+        except Exception as e:
+            try:
+                await self.send({"type": "error", "revision": revision, "detail": str(e)})
+            except (WebSocketDisconnect, RuntimeError):
+                # The client is gone; the route's receive loop cleans up
+                pass
+
+    async def _analyze(self, revision: int, request: LivePromptRevision) -> EnergySavedResponse:
+        # One registry snapshot, so every message reports the same version
+        registry = self.energy_calculator.registry_source.current()
+        original = await run_in_threadpool(
+            self.energy_calculator.analyze_prompt, request.text,
+            request.model_name, request.region, registry)
+        await self.send({
+            "type": "original",
+            "revision": revision,
+            "tokens": original.tokens,
+            "energy_mwh": original.energy_mwh,
+            "co2_grams": original.co2_grams,
+            "registry_version": original.registry_version,
+        })
+
+        # Tagging dominates; a newer revision cancels us between the steps
+        analysis = await run_in_threadpool(
+            self.prompt_optimizer.analyze_prompt, request.text)
+        energies = {}
+        for variant in VARIANTS:
+            text = getattr(analysis, variant)
+            energies[variant] = await run_in_threadpool(
+                self.energy_calculator.analyze_prompt, text,
+                request.model_name, request.region, registry)
+            await self.send(self._variant_message(
+                revision, variant, text, energies[variant].tokens,
+                original.energy_mwh - energies[variant].energy_mwh,
+                energies[variant].co2_grams))
+
+        result = energy_saved_response(
+            analysis, original, energies["balanced"], energies["aggressive"],
+            energies["conservative"])
+        await self.send({"type": "done", "revision": revision, "result": result.model_dump()})
+        return result
+
+    async def _send_cached(self, revision: int, cached: Dict[str, Any],
+                           model_name: str) -> None:
+        # Token counts are not part of the cached response; counting is cheap
+        # compared to the rest of the analysis
+        texts = [cached["original"]] + [cached[variant] for variant in VARIANTS]
+        tokens = await run_in_threadpool(
+            self.energy_calculator.count_tokens_batch, texts, model_name)
+        await self.send({
+            "type": "original",
+            "revision": revision,
+            "tokens": tokens[0],
+            "energy_mwh": cached["original_energy"],
+            "co2_grams": cached["co2emission_original"],
+            "registry_version": cached["registry_version"],
+        })
+        co2_fields = {"conservative": "co2emission_conservative",
+                      "balanced": "co2emission_balanced",
+                      "aggressive": "co2emission_aggresive"}
+        for variant, variant_tokens in zip(VARIANTS, tokens[1:]):
+            await self.send(self._variant_message(
+                revision, variant, cached[variant], variant_tokens,
+                cached[f"energy_saved_{variant}"], cached[co2_fields[variant]]))
+        await self.send({"type": "done", "revision": revision, "result": cached})
+
+    @staticmethod
+    def _variant_message(revision: int, variant: str, text: str,
+                         tokens: int, energy_saved: float,
+                         co2_grams: float) -> Dict[str, Any]:
+        return {
+            "type": "variant",
+            "revision": revision,
+            "variant": variant,
+            "text": text,
+            "tokens": tokens,
+            "energy_saved_mwh": energy_saved,
+            "co2_grams": co2_grams,
+        }
@@ -0,0 +1,135 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from fastapi import HTTPException
+
+
+class ModelLoader:
+    """
+    Builds an expensive model holder exactly once on a background thread.
+
+    `start` is idempotent: concurrent callers share one load, and a new load
+    is only attempted after a failure. Requests never wait for the load;
+    `get` raises 503 until it has finished, and `status` reports per-model
+    progress for readiness probes.
+    """
+
+    def __init__(self, factory: Callable[..., Any], retry_after: int = 5):
+        """
+        Initialize the loader.
+
+        Args:
+            factory: Builds the holder; called with a `progress` keyword
+                argument taking (model, status, load_seconds)
+            retry_after: Seconds suggested to clients while loading
+        """
+        self.factory = factory
+        self.retry_after = retry_after
+        self.instance = None
+        self.future: Optional[Future] = None
+        self.state = "not_started"
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # model name -> {"status", "load_time_s"}
+        self.models: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="model-loader")
+
+    def _begin(self) -> None:
+        self.state = "loading"
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+
+    def start(self) -> Future:
+        """Start the background load unless it is running or has succeeded."""
+        with self.lock:
+            if self.future is None or self.state == "failed":
+                self._begin()
+                self.future = self.executor.submit(self._load)
+            return self.future
+
+    def preload(self) -> Any:
+        """
+        Load synchronously in the calling thread.
+
+        Used by a pre-fork server master so that forked workers share the
+        loaded weights copy-on-write; `start` is then a no-op in the workers.
+        """
+        with self.lock:
+            owner = self.future is None or self.state == "failed"
+            if owner:
+                self._begin()
+                self.future = Future()
+            future = self.future
+        if not owner:
+            # Already loaded, or being loaded by another thread
+            return future.result()
+        try:
+            future.set_result(self._load())
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        return future.result()
+
+    def _progress(self, model: str, status: str, seconds: Optional[float] = None) -> None:
+        with self.lock:
+            self.models[model] = {
+                "status": status,
+                "load_time_s": round(seconds, 3) if seconds is not None else None,
+            }
+
+    def _load(self) -> Any:
+        try:
+            instance = self.factory(progress=self._progress)
+        except Exception as e:
+            with self.lock:
+                self.state = "failed"
+                self.error = str(e)
+                self.finished_at = time.time()
+                for model in self.models.values():
+                    if model["status"] == "loading":
+                        model["status"] = "failed"
+            print(f"Warning: model loading failed: {e}")
+            raise
+        with self.lock:
+            self.instance = instance
+            self.state = "ready"
+            self.finished_at = time.time()
+        return instance
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def get(self) -> Any:
+        """
+        Return the loaded holder, or raise 503 while it is unavailable.
+
+        A load is started if none is running, so the service still comes up
+        when the startup hook was skipped.
+        """
+        if self.instance is not None:
+            return self.instance
+        self.start()
+        detail = ("Models failed to load" if self.state == "failed"
+                  else "Models are still loading")
+        raise HTTPException(
+            status_code=503, detail=detail,
+            headers={"Retry-After": str(self.retry_after)})
+
+    def status(self) -> Dict[str, Any]:
+        with self.lock:
+            end = self.finished_at or time.time()
+            return {
+                "status": self.state,
+                "models": {name: dict(model) for name, model in self.models.items()},
+                "elapsed_s": round(end - self.started_at, 3) if self.started_at else None,
+                "error": self.error,
+            }
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
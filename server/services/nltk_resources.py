@@ -0,0 +1,172 @@
+import argparse
+import os
+from pathlib import Path
+from typing import List, Optional
+
+# Directory the provisioning command vendors corpora into. It is searched
+# before NLTK's default locations, so the server never needs the network.
+NLTK_DATA_DIR = os.environ.get(
+    "PROMPTGREEN_NLTK_DATA",
+    str(Path(__file__).resolve().parent.parent / "nltk_data")
+)
+
+# Directory tiktoken caches its BPE files in. The provisioning command
+# pre-fetches every encoding the energy registry uses into it.
+TIKTOKEN_CACHE_DIR = os.environ.get(
+    "TIKTOKEN_CACHE_DIR",
+    str(Path(__file__).resolve().parent.parent / "tiktoken_cache")
+)
+
+REQUIRED_DATA = [
+    ('tokenizers/punkt', 'punkt'),
+    ('tokenizers/punkt_tab', 'punkt_tab'),
+    ('corpora/stopwords', 'stopwords'),
+    ('taggers/averaged_perceptron_tagger', 'averaged_perceptron_tagger'),
+    ('taggers/averaged_perceptron_tagger_eng',
+     'averaged_perceptron_tagger_eng'),
+    ('corpora/wordnet', 'wordnet'),
+    ('corpora/omw-1.4', 'omw-1.4')  # For wordnet lemmatizer
+]
+
+
+def register_nltk_data_dir(data_dir: str = NLTK_DATA_DIR) -> None:
+    """Put the vendored data directory first on NLTK's search path."""
+    import nltk.data
+
+    if data_dir not in nltk.data.path:
+        nltk.data.path.insert(0, data_dir)
+
+
+def register_tiktoken_cache_dir(cache_dir: str = TIKTOKEN_CACHE_DIR) -> None:
+    """Make tiktoken read (and write) its encodings in the vendored directory."""
+    os.environ.setdefault("TIKTOKEN_CACHE_DIR", cache_dir)
+
+
+def missing_nltk_data(data_dir: str = NLTK_DATA_DIR,
+                      only_data_dir: bool = False) -> List[str]:
+    """
+    List required resources that cannot be found locally.
+
+    Args:
+        data_dir: Vendored data directory to search first
+        only_data_dir: Search only data_dir instead of every NLTK location,
+            e.g. to check what a vendored image will contain
+
+    Returns:
+        Download names of the missing resources
+    """
+    import nltk.data
+
+    register_nltk_data_dir(data_dir)
+    paths = [data_dir] if only_data_dir else None
+    missing = []
+    for data_path, download_name in REQUIRED_DATA:
+        try:
+            nltk.data.find(data_path, paths=paths)
+        except LookupError:
+            missing.append(download_name)
+    return missing
+
+
+def download_nltk_data(data_dir: str = NLTK_DATA_DIR) -> List[str]:
+    """
+    Download every resource missing from the vendored data directory.
+
+    Copies in other NLTK locations (e.g. ~/nltk_data) are ignored, so the
+    directory ends up complete on its own for air-gapped deployments.
+
+    Args:
+        data_dir: Directory to download into
+
+    Returns:
+        Download names of resources that could not be downloaded
+    """
+    import nltk
+
+    failed = []
+    for download_name in missing_nltk_data(data_dir, only_data_dir=True):
+        print(f"Downloading {download_name} into {data_dir}...")
+        if not nltk.download(download_name, download_dir=data_dir,
+                             quiet=True):
+            print(f"⚠ Could not download {download_name}")
+            failed.append(download_name)
+        else:
+            print(f"✓ {download_name} downloaded successfully")
+    return failed
+
+
+def required_tiktoken_encodings() -> List[str]:
+    """Encodings of every model in the energy registry, plus the fallback."""
+    import tiktoken
+    from services.energy_registry import energy_registry
+
+    encodings = {"cl100k_base"}
+    for model_name, coefficients in energy_registry.current().models.items():
+        if coefficients.tokenizer:
+            encodings.add(coefficients.tokenizer)
+            continue
+        try:
+            encodings.add(tiktoken.encoding_name_for_model(model_name))
+        except KeyError:
+            pass
+    return sorted(encodings)
+
+
+def download_tiktoken_encodings(cache_dir: str = TIKTOKEN_CACHE_DIR) -> List[str]:
+    """
+    Download the tiktoken encodings into the cache directory.
+
+    Args:
+        cache_dir: Directory to download into
+
+    Returns:
+        Names of encodings that could not be downloaded
+    """
+    import tiktoken
+
+    # tiktoken reads the variable on every load, so this targets cache_dir
+    os.environ["TIKTOKEN_CACHE_DIR"] = cache_dir
+    failed = []
+    for encoding_name in required_tiktoken_encodings():
+        print(f"Fetching tiktoken encoding {encoding_name} into {cache_dir}...")
+        try:
+            tiktoken.get_encoding(encoding_name)
+        except Exception as e:
+            print(f"⚠ Could not fetch {encoding_name}: {e}")
+            failed.append(encoding_name)
+        else:
+            print(f"✓ {encoding_name} cached")
+    return failed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Provision the NLTK corpora and tiktoken encodings used "
+                    "by the prompt optimizer.")
+    parser.add_argument("--dir", default=NLTK_DATA_DIR,
+                        help=f"Target directory (default: {NLTK_DATA_DIR})")
+    parser.add_argument("--tiktoken-dir", default=TIKTOKEN_CACHE_DIR,
+                        help=f"tiktoken cache directory (default: {TIKTOKEN_CACHE_DIR})")
+    parser.add_argument("--check", action="store_true",
+                        help="Only report NLTK resources missing from the "
+                             "target directory, never download")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        missing = missing_nltk_data(args.dir, only_data_dir=True)
+        for download_name in missing:
+            print(f"✗ {download_name} missing")
+        if not missing:
+            print("All NLTK data ready!")
+        return 1 if missing else 0
+
+    failed = download_nltk_data(args.dir)
+    failed += download_tiktoken_encodings(args.tiktoken_dir)
+    if failed:
+        return 1
+    print("All NLTK data and tiktoken encodings ready!")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
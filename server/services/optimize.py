@@ -1,57 +1,36 @@
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.tag import pos_tag
-from nltk.stem import WordNetLemmatizer
 from collections import defaultdict
 import re
 from dto.optimize_prompt_dto import PromptResponse
+from services.clause_matcher import get_clause_matcher
+from services.nltk_resources import register_nltk_data_dir
 
-# Download required NLTK data (run once)
+# NLTK is imported lazily so that importing this module stays fast and never
+# touches the network. Corpora are provisioned ahead of time with
+# `python -m services.nltk_resources` and loaded on first use.
 
 
-def download_nltk_data():
-    """Download all required NLTK data"""
-    required_data = [
-        ('tokenizers/punkt', 'punkt'),
-        ('tokenizers/punkt_tab', 'punkt_tab'),
-        ('corpora/stopwords', 'stopwords'),
-        ('taggers/averaged_perceptron_tagger', 'averaged_perceptron_tagger'),
-        ('taggers/averaged_perceptron_tagger_eng',
-         'averaged_perceptron_tagger_eng'),
-        ('corpora/wordnet', 'wordnet'),
-        ('corpora/omw-1.4', 'omw-1.4')  # For wordnet lemmatizer
-    ]
+def _word_tokenize(text):
+    from nltk.tokenize import word_tokenize
+    return word_tokenize(text)
 
-    for data_path, download_name in required_data:
-        try:
-            nltk.data.find(data_path)
-            print(f"✓ {download_name} already available")
-        except LookupError:
-            print(f"Downloading {download_name}...")
-            try:
-                nltk.download(download_name)
-                print(f"✓ {download_name} downloaded successfully")
-            except Exception as e:
-                print(f"⚠ Could not download {download_name}: {e}")
-                print("Trying alternative method...")
-                # Try without checking path first
-                nltk.download(download_name, quiet=False)
-
-
-# Download data
-print("Checking and downloading required NLTK data...")
-try:
-    download_nltk_data()
-    print("All NLTK data ready!\n")
-except Exception as e:
-    print(f"Warning: Some NLTK data may not be available: {e}")
-    print("The script will use fallback methods where needed.\n")
+
+def _pos_tag(tokens):
+    from nltk.tag import pos_tag
+    return pos_tag(tokens)
 
 
 class PromptOptimizer:
     def __init__(self):
-        self.stop_words = set(stopwords.words('english'))
+        register_nltk_data_dir()
+        from nltk.corpus import stopwords
+        from nltk.stem import WordNetLemmatizer
+
+        try:
+            self.stop_words = set(stopwords.words('english'))
+        except LookupError as e:
+            raise RuntimeError(
+                "NLTK stopwords corpus not found; provision it with "
+                "`python -m services.nltk_resources`") from e
         self.custom_stop_words = {'english': {
             'please', 'kindly', 'a', 'an', 'the', 'such',
             'only', 'own', 'same', 'so', 'than', 'too',
@@ -347,6 +326,7 @@ class PromptOptimizer:
             r'\bi\'m searching for\b',
             r'\bi\'m seeking\b',
         ]
+        self.clause_matcher = get_clause_matcher(tuple(self.request_clauses))
 
         # Important POS tags to keep for prompt optimization
         self.important_pos_tags = {
@@ -374,20 +354,8 @@ class PromptOptimizer:
 
     def remove_request_clauses(self, text):
         """Remove common request clauses and phrases"""
-        original_text = text
-        removed_clauses = []
-
-        # Convert to lowercase for matching but preserve original case
-        text_lower = text.lower()
-
-        for clause_pattern in self.request_clauses:
-            matches = re.finditer(clause_pattern, text_lower, re.IGNORECASE)
-            for match in matches:
-                removed_clauses.append(match.group())
-
-        # Remove the clauses (case-insensitive)
-        for clause_pattern in self.request_clauses:
-            text = re.sub(clause_pattern, '', text, flags=re.IGNORECASE)
+        # Single scan with the compiled matcher; every removed span is reported
+        text, removed_clauses = self.clause_matcher.remove(text)
 
         # Clean up extra spaces and punctuation
         text = re.sub(r'\s+', ' ', text)  # Multiple spaces to single space
@@ -416,8 +384,8 @@ class PromptOptimizer:
     def analyze_pos_tags(self, text):
         """Analyze POS tags in the text"""
         try:
-            tokens = word_tokenize(text)
-            pos_tags = pos_tag(tokens)
+            tokens = _word_tokenize(text)
+            pos_tags = _pos_tag(tokens)
         except Exception as e:
             print(f"Error with NLTK POS tagging: {e}")
             print("Falling back to simple tokenization...")
@@ -452,14 +420,18 @@ class PromptOptimizer:
 
         return stopwords_found, important_words
 
-    def optimize_prompt_conservative(self, prompt):
-        """Conservative optimization - only remove clear stopwords and request clauses"""
-        # First remove request clauses
+    def run_pipeline(self, prompt):
+        """Remove clauses, preprocess and POS tag the prompt in a single pass"""
         text_no_clauses, removed_clauses = self.remove_request_clauses(prompt)
-
         processed_text = self.preprocess_text(text_no_clauses)
-        tokens = word_tokenize(processed_text)
-        pos_tags = pos_tag(tokens)
+        pos_tags, pos_analysis = self.analyze_pos_tags(processed_text)
+
+        return text_no_clauses, removed_clauses, pos_tags, pos_analysis
+
+    def optimize_prompt_conservative(self, prompt, pos_tags=None):
+        """Conservative optimization - only remove clear stopwords and request clauses"""
+        if pos_tags is None:
+            _, _, pos_tags, _ = self.run_pipeline(prompt)
 
         optimized_tokens = []
         for word, pos in pos_tags:
@@ -470,14 +442,10 @@ class PromptOptimizer:
 
         return ' '.join(optimized_tokens)
 
-    def optimize_prompt_aggressive(self, prompt):
+    def optimize_prompt_aggressive(self, prompt, pos_tags=None):
         """Aggressive optimization - remove stopwords, request clauses, and less important POS tags"""
-        # First remove request clauses
-        text_no_clauses, removed_clauses = self.remove_request_clauses(prompt)
-
-        processed_text = self.preprocess_text(text_no_clauses)
-        tokens = word_tokenize(processed_text)
-        pos_tags = pos_tag(tokens)
+        if pos_tags is None:
+            _, _, pos_tags, _ = self.run_pipeline(prompt)
 
         optimized_tokens = []
         for word, pos in pos_tags:
@@ -489,14 +457,10 @@ class PromptOptimizer:
 
         return ' '.join(optimized_tokens)
 
-    def optimize_prompt_balanced(self, prompt):
+    def optimize_prompt_balanced(self, prompt, pos_tags=None):
         """Balanced optimization - smart filtering based on context"""
-        # First remove request clauses
-        text_no_clauses, removed_clauses = self.remove_request_clauses(prompt)
-
-        processed_text = self.preprocess_text(text_no_clauses)
-        tokens = word_tokenize(processed_text)
-        pos_tags = pos_tag(tokens)
+        if pos_tags is None:
+            _, _, pos_tags, _ = self.run_pipeline(prompt)
 
         optimized_tokens = []
         for i, (word, pos) in enumerate(pos_tags):
@@ -520,14 +484,16 @@ class PromptOptimizer:
 
         return ' '.join(optimized_tokens)
 
-    def analyze_prompt(self, prompt: str):
-        """Comprehensive analysis of the prompt"""
+    @staticmethod
+    def _print_analysis(prompt, text_no_clauses, removed_clauses, pos_analysis,
+                        stopwords_found, important_words,
+                        conservative, aggressive, balanced):
+        """Print the human readable report of analyze_prompt"""
         print(f"Original prompt: {prompt}")
         print(f"Length: {len(prompt)} characters, {len(prompt.split())} words")
         print("-" * 50)
 
         # Request clause analysis
-        text_no_clauses, removed_clauses = self.remove_request_clauses(prompt)
         if removed_clauses:
             print("Request clauses removed:")
             for clause in set(removed_clauses):  # Remove duplicates
@@ -536,14 +502,12 @@ class PromptOptimizer:
             print()
 
         # POS analysis
-        pos_tags, pos_analysis = self.analyze_pos_tags(text_no_clauses)
         print("POS Tag Analysis:")
         for pos, words in sorted(pos_analysis.items()):
             print(f"  {pos}: {words}")
         print()
 
         # Stopword analysis
-        stopwords_found, important_words = self.find_stopwords_by_pos(pos_tags)
         print("Stopwords and filterable words found:")
         for word, pos, reason in stopwords_found:
             print(f"  '{word}' ({pos}) - {reason}")
@@ -555,10 +519,6 @@ class PromptOptimizer:
         print()
 
         # Optimization results
-        conservative = self.optimize_prompt_conservative(prompt)
-        aggressive = self.optimize_prompt_aggressive(prompt)
-        balanced = self.optimize_prompt_balanced(prompt)
-
         print("Optimization Results:")
         print(f"Conservative: {conservative}")
         print(
@@ -574,6 +534,26 @@ class PromptOptimizer:
         print(
             f"  Length: {len(balanced)} chars, {len(balanced.split())} words")
 
+    def analyze_prompt(self, prompt: str, verbose: bool = False):
+        """Comprehensive analysis of the prompt.
+
+        The step by step report is only printed when `verbose` is set, so
+        servers and batch jobs don't write it for every prompt."""
+        # Shared pipeline: clause removal, preprocessing and tagging run once
+        text_no_clauses, removed_clauses, pos_tags, pos_analysis = \
+            self.run_pipeline(prompt)
+        stopwords_found, important_words = self.find_stopwords_by_pos(pos_tags)
+
+        conservative = self.optimize_prompt_conservative(prompt, pos_tags)
+        aggressive = self.optimize_prompt_aggressive(prompt, pos_tags)
+        balanced = self.optimize_prompt_balanced(prompt, pos_tags)
+
+        if verbose:
+            self._print_analysis(
+                prompt, text_no_clauses, removed_clauses, pos_analysis,
+                stopwords_found, important_words,
+                conservative, aggressive, balanced)
+
         return PromptResponse(
             original=str(prompt),
             conservative=str(conservative),
@@ -610,7 +590,7 @@ class PromptOptimizer:
 
 #     for i, prompt in enumerate(example_prompts, 1):
 #         print(f"EXAMPLE {i}:")
-#         optimizer.analyze_prompt(prompt)
+#         optimizer.analyze_prompt(prompt, verbose=True)
 #         print("\n" + "="*80 + "\n")
 
 #     # Interactive mode
@@ -621,7 +601,7 @@ class PromptOptimizer:
 #             break
 #         if user_prompt:
 #             print()
-#             optimizer.analyze_prompt(user_prompt)
+#             optimizer.analyze_prompt(user_prompt, verbose=True)
 #             print("\n" + "-"*50)
 
 
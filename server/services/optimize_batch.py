@@ -0,0 +1,286 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+from dto.energy_dto import PromptEnergyResponse
+from dto.optimize_prompt_dto import (
+    PromptRequest, PromptResponse, EnergySavedResponse, BatchItemResult,
+    BatchEnergySavedResponse, PromptRequestV2, PromptAnalysisResponseV2,
+    OriginalEnergy, VariantResult, TaggedWord, StopwordFinding,
+    ALL_ANALYSIS_FIELDS)
+from services.optimize import PromptOptimizer
+from services.energy_calculation import TokenEnergyCalculator
+from services.result_cache import result_cache
+from services.energy_registry import energy_registry
+
+
+VARIANTS = ("conservative", "balanced", "aggressive")
+
+
+def optimize_cache_key(text: str, model_name: str, region: Optional[str] = None,
+                       namespace: str = "optimize", **params) -> str:
+    """Result cache key of an optimization; a registry reload invalidates it."""
+    registry = energy_registry.current()
+    return result_cache.make_key(
+        namespace, text, model_name=model_name,
+        region=registry.resolve_region(region), registry_version=registry.version,
+        **params)
+
+
+def energy_saved_response(analysis: PromptResponse,
+                          original: PromptEnergyResponse,
+                          balanced: PromptEnergyResponse,
+                          aggressive: PromptEnergyResponse,
+                          conservative: PromptEnergyResponse) -> EnergySavedResponse:
+    """
+    Combine a prompt analysis with the energy of the original and each variant.
+
+    Args:
+        analysis: Variants and diagnostics from PromptOptimizer.analyze_prompt
+        original, balanced, aggressive, conservative: Energy of each text
+
+    Returns:
+        EnergySavedResponse: Variants, diagnostics and energy figures
+    """
+    return EnergySavedResponse(
+        original=analysis.original,
+        conservative=analysis.conservative,
+        aggressive=analysis.aggressive,
+        balanced=analysis.balanced,
+        removed_clauses=analysis.removed_clauses,
+        text_after_clause_removal=analysis.text_after_clause_removal,
+        pos_analysis=analysis.pos_analysis,
+        stopwords_found=analysis.stopwords_found,
+        important_words=analysis.important_words,
+        energy_saved_balanced=original.energy_mwh - balanced.energy_mwh,
+        energy_saved_aggressive=original.energy_mwh - aggressive.energy_mwh,
+        energy_saved_conservative=original.energy_mwh - conservative.energy_mwh,
+        original_energy=original.energy_mwh,
+        co2emission_conservative=conservative.co2_grams,
+        co2emission_aggresive=aggressive.co2_grams,
+        co2emission_balanced=balanced.co2_grams,
+        co2emission_original=original.co2_grams,
+        region=original.region,
+        registry_version=original.registry_version
+    )
+
+
+def variant_energies(prompt: PromptRequest, analysis: PromptResponse,
+                     energy_calculator: TokenEnergyCalculator) -> List[PromptEnergyResponse]:
+    """
+    Energy of the original and the balanced, aggressive and conservative
+    variants, in that order; all four texts are tokenized in one batched call.
+    """
+    return energy_calculator.analyze_prompts(
+        [prompt.text, analysis.balanced, analysis.aggressive, analysis.conservative],
+        model=prompt.model_name, region=prompt.region)
+
+
+def optimize_with_energy(prompt: PromptRequest,
+                         prompt_optimizer: PromptOptimizer,
+                         energy_calculator: TokenEnergyCalculator) -> EnergySavedResponse:
+    """
+    Optimize one prompt and compute the energy saved by each variant.
+
+    Args:
+        prompt: The prompt and target model
+        prompt_optimizer: Rule-based optimizer
+        energy_calculator: Token energy calculator
+
+    Returns:
+        EnergySavedResponse: Variants, diagnostics and energy figures
+    """
+    analysis = prompt_optimizer.analyze_prompt(prompt=prompt.text)
+    return energy_saved_response(
+        analysis, *variant_energies(prompt, analysis, energy_calculator))
+
+
+def analyze_with_energy_v2(prompt: PromptRequestV2,
+                           prompt_optimizer: PromptOptimizer,
+                           energy_calculator: TokenEnergyCalculator) -> PromptAnalysisResponseV2:
+    """
+    Optimize one prompt, computing only the requested fields.
+
+    Args:
+        prompt: The prompt, target model and requested fields
+        prompt_optimizer: Rule-based optimizer
+        energy_calculator: Token energy calculator
+
+    Returns:
+        PromptAnalysisResponseV2: Typed results; unrequested fields are None
+    """
+    fields = set(prompt.fields or ALL_ANALYSIS_FIELDS)
+    variants = [variant for variant in VARIANTS if variant in fields]
+    needs_tags = bool(variants) or bool(
+        fields & {"pos_analysis", "stopwords_found", "important_words"})
+    response = PromptAnalysisResponseV2(original=prompt.text, model_name=prompt.model_name)
+
+    # Tagging is the expensive step, so it only runs when something needs it
+    if needs_tags:
+        text_no_clauses, removed_clauses, pos_tags, pos_analysis = \
+            prompt_optimizer.run_pipeline(prompt.text)
+    elif fields & {"removed_clauses", "text_after_clause_removal"}:
+        text_no_clauses, removed_clauses = prompt_optimizer.remove_request_clauses(prompt.text)
+
+    if "removed_clauses" in fields:
+        response.removed_clauses = list(removed_clauses)
+    if "text_after_clause_removal" in fields:
+        response.text_after_clause_removal = text_no_clauses
+    if "pos_analysis" in fields:
+        response.pos_analysis = dict(pos_analysis)
+    if fields & {"stopwords_found", "important_words"}:
+        stopwords_found, important_words = prompt_optimizer.find_stopwords_by_pos(pos_tags)
+        if "stopwords_found" in fields:
+            response.stopwords_found = [
+                StopwordFinding(word=word, pos=pos, reason=reason)
+                for word, pos, reason in stopwords_found]
+        if "important_words" in fields:
+            response.important_words = [
+                TaggedWord(word=word, pos=pos) for word, pos in important_words]
+
+    for variant in variants:
+        optimize = getattr(prompt_optimizer, f"optimize_prompt_{variant}")
+        response.variants[variant] = VariantResult(text=optimize(prompt.text, pos_tags))
+
+    if "energy" in fields:
+        # The original and every requested variant in one batched call
+        original, *variant_energies = energy_calculator.analyze_prompts(
+            [prompt.text] + [response.variants[v].text for v in variants],
+            model=prompt.model_name, region=prompt.region)
+        response.region = original.region
+        response.registry_version = original.registry_version
+        response.original_energy = OriginalEnergy(
+            tokens=original.tokens, energy_mwh=original.energy_mwh,
+            co2_grams=original.co2_grams)
+        for variant, energy in zip(variants, variant_energies):
+            result = response.variants[variant]
+            result.tokens = energy.tokens
+            result.energy_mwh = energy.energy_mwh
+            result.energy_saved_mwh = original.energy_mwh - energy.energy_mwh
+            result.co2_grams = energy.co2_grams
+    return response
+
+
+# Per-process services, built once by the pool initializer
+_worker_optimizer = None
+_worker_calculator = None
+
+# Worker processes are started from a clean server process rather than
+# forked from the (threaded) caller, whose locks may be held mid-fork
+WORKER_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+
+def _init_worker():
+    global _worker_optimizer, _worker_calculator
+    _worker_optimizer = PromptOptimizer()
+    _worker_calculator = TokenEnergyCalculator()
+
+
+def _optimize_chunk(chunk: List[Tuple[int, str, str, Optional[str]]]) -> List[Tuple[int, Optional[dict], Optional[str]]]:
+    results = []
+    for index, text, model_name, region in chunk:
+        try:
+            response = optimize_with_energy(
+                PromptRequest(text=text, model_name=model_name, region=region),
+                _worker_optimizer, _worker_calculator)
+            results.append((index, response.model_dump(), None))
+        except Exception as e:
+            results.append((index, None, str(e)))
+    return results
+
+
+class BatchOptimizer:
+    """
+    Spreads rule-based optimization of many prompts across a process pool.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 32):
+        """
+        Initialize the batch optimizer. The pool is started on first use.
+
+        Args:
+            max_workers: Number of worker processes (default: CPU count)
+            chunk_size: Number of prompts sent to a worker per task
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.pool = None
+        self.lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=WORKER_MP_CONTEXT,
+                    initializer=_init_worker)
+            return self.pool
+
+    def optimize(self, prompts: List[PromptRequest]) -> BatchEnergySavedResponse:
+        """
+        Optimize a batch of prompts, reporting failures per item.
+
+        Args:
+            prompts: Prompts with their target models
+
+        Returns:
+            BatchEnergySavedResponse: Per-item results and aggregate totals
+        """
+        results: List[Optional[BatchItemResult]] = [None] * len(prompts)
+        cache_keys = {}
+        pending = []
+        for index, prompt in enumerate(prompts):
+            cache_key = optimize_cache_key(prompt.text, prompt.model_name, prompt.region)
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                results[index] = BatchItemResult(
+                    index=index, result=EnergySavedResponse(**cached))
+            else:
+                cache_keys[index] = cache_key
+                pending.append((index, prompt.text, prompt.model_name, prompt.region))
+
+        chunks = [pending[i:i + self.chunk_size]
+                  for i in range(0, len(pending), self.chunk_size)]
+        futures = [self._get_pool().submit(_optimize_chunk, chunk) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            try:
+                chunk_results = future.result()
+            except Exception as e:
+                # The worker itself died; fail only this chunk's items
+                if isinstance(e, BrokenProcessPool):
+                    self.shutdown()
+                chunk_results = [(index, None, str(e)) for index, *_ in chunk]
+            for index, result, error in chunk_results:
+                if result is not None:
+                    result_cache.set(cache_keys[index], result)
+                    results[index] = BatchItemResult(
+                        index=index, result=EnergySavedResponse(**result))
+                else:
+                    results[index] = BatchItemResult(index=index, error=error)
+
+        succeeded = [item.result for item in results if item.result is not None]
+        return BatchEnergySavedResponse(
+            results=results,
+            succeeded=len(succeeded),
+            failed=len(results) - len(succeeded),
+            total_original_energy=sum(r.original_energy for r in succeeded),
+            total_energy_saved_balanced=sum(r.energy_saved_balanced for r in succeeded),
+            total_energy_saved_aggressive=sum(r.energy_saved_aggressive for r in succeeded),
+            total_energy_saved_conservative=sum(r.energy_saved_conservative for r in succeeded),
+            total_co2emission_original=sum(r.co2emission_original for r in succeeded),
+            total_co2emission_balanced=sum(r.co2emission_balanced for r in succeeded),
+            total_co2emission_aggresive=sum(r.co2emission_aggresive for r in succeeded),
+            total_co2emission_conservative=sum(r.co2emission_conservative for r in succeeded),
+        )
+
+    def shutdown(self) -> None:
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = None
+
+
+batch_optimizer = BatchOptimizer(
+    max_workers=int(os.environ.get("OPTIMIZE_BATCH_WORKERS", "0")) or None)
@@ -0,0 +1,63 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, List
+import numpy as np
+
+
+class PhraseEmbeddingCache:
+    """
+    Bounded LRU cache of candidate-phrase embeddings keyed by phrase text.
+
+    Phrases that recur across prompts ("machine learning", "write code")
+    are embedded once and reused, so only unseen phrases cost a forward pass.
+    """
+
+    def __init__(self, embed: Callable[[List[str]], np.ndarray],
+                 max_size: int = 50000):
+        """
+        Initialize the cache.
+
+        Args:
+            embed: Callable that embeds a list of phrases in one batch
+            max_size: Maximum number of phrase embeddings kept in memory
+        """
+        self.embed = embed
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, phrases: List[str]) -> np.ndarray:
+        """
+        Return embeddings for the phrases, embedding only the missing ones.
+
+        Args:
+            phrases: Candidate phrases
+
+        Returns:
+            Array of shape (len(phrases), dim) in the order given
+        """
+        found = {}
+        with self.lock:
+            for phrase in phrases:
+                embedding = self.entries.get(phrase)
+                if embedding is not None:
+                    self.entries.move_to_end(phrase)
+                    found[phrase] = embedding
+            self.hits += len(found)
+
+        missing = [phrase for phrase in dict.fromkeys(phrases)
+                   if phrase not in found]
+        if missing:
+            embeddings = self.embed(missing)
+            with self.lock:
+                self.misses += len(missing)
+                for phrase, embedding in zip(missing, embeddings):
+                    found[phrase] = embedding
+                    self.entries[phrase] = embedding
+                    self.entries.move_to_end(phrase)
+                while len(self.entries) > self.max_size:
+                    self.entries.popitem(last=False)
+
+        return np.vstack([found[phrase] for phrase in phrases])
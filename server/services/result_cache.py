@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class InMemoryCacheBackend:
+    """
+    Process-local LRU cache with per-entry expiry.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        """
+        Initialize the backend.
+
+        Args:
+            max_size: Maximum number of entries kept in memory
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                self.evictions += 1
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def size(self) -> int:
+        return len(self.entries)
+
+
+class RedisCacheBackend:
+    """
+    Shared cache backend so every worker sees the same results.
+
+    Requires the optional `redis` package. Expiry and eviction are delegated
+    to Redis (configure `maxmemory-policy` for size bounds).
+    """
+
+    def __init__(self, url: str, prefix: str = "promptgreen:"):
+        """
+        Connect to Redis.
+
+        Args:
+            url: Redis connection URL, e.g. redis://localhost:6379/0
+            prefix: Key prefix so the cache can share a database
+        """
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "RESULT_CACHE_URL is set but the 'redis' package is not installed") from e
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def size(self) -> Optional[int]:
+        # DBSIZE counts every key in the database, not just this cache's, and
+        # counting prefixed keys needs a full SCAN; report no size instead
+        return None
+
+
+class ResultCache:
+    """
+    Content-addressed cache for optimization results.
+
+    Keys are a SHA-256 of the namespace, the normalized text and every
+    parameter that changes the output, so identical prompts from different
+    users share one entry.
+    """
+
+    def __init__(self, backend, ttl: int = 3600):
+        """
+        Initialize the cache.
+
+        Args:
+            backend: InMemoryCacheBackend or RedisCacheBackend
+            ttl: Seconds an entry stays valid
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        # Requests run on many threads; `+=` on an attribute isn't atomic
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        """Build the cache from RESULT_CACHE_* environment variables."""
+        url = os.environ.get("RESULT_CACHE_URL")
+        if url:
+            backend = RedisCacheBackend(url)
+        else:
+            backend = InMemoryCacheBackend(
+                max_size=int(os.environ.get("RESULT_CACHE_SIZE", "10000")))
+        return cls(backend, ttl=int(os.environ.get("RESULT_CACHE_TTL", "3600")))
+
+    @staticmethod
+    def make_key(namespace: str, text: str, **params) -> str:
+        normalized = unicodedata.normalize("NFC", text)
+        payload = json.dumps([namespace, normalized, sorted(params.items())])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            # A broken shared backend must never fail the request itself
+            print(f"Result cache lookup failed: {e}")
+            with self.lock:
+                self.errors += 1
+            value = None
+        with self.lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            print(f"Result cache store failed: {e}")
+            with self.lock:
+                self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            size = self.backend.size()
+        except Exception as e:
+            print(f"Result cache size lookup failed: {e}")
+            with self.lock:
+                self.errors += 1
+            size = None
+        with self.lock:
+            hits, misses, errors = self.hits, self.misses, self.errors
+        lookups = hits + misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "errors": errors,
+            "evictions": self.backend.evictions,
+            "size": size,
+            "ttl": self.ttl,
+        }
+
+
+result_cache = ResultCache.from_env()
@@ -0,0 +1,156 @@
+import argparse
+import gc
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+# Deployment mode where the AI models load once in a pre-fork master and
+# workers share the weight pages copy-on-write. See gunicorn.conf.py.
+
+
+def preload_shared_models() -> None:
+    """
+    Load the AI models in the current (master) process before workers fork.
+
+    Objects that exist now are moved out of the garbage collector's reach
+    so that collections in the workers do not write to, and thereby copy,
+    the pages holding them. Tensor storages live outside the Python object
+    headers, so reference counting alone does not unshare the weights.
+    """
+    from routers.ai_prompt_optimize import ai_model_loader
+
+    ai_model_loader.preload()
+    gc.collect()
+    gc.freeze()
+
+
+def configure_worker_threads(workers: int) -> None:
+    """Split the CPU cores between workers so intra-op threads don't oversubscribe."""
+    import torch
+
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // max(1, workers)))
+
+
+def memory_usage(pid: int) -> Dict[str, int]:
+    """
+    Memory figures of a process in KiB, from /proc/<pid>/smaps_rollup.
+
+    Rss counts shared pages in full for every process, Pss divides them
+    between the processes that share them and Private is what the process
+    alone holds.
+    """
+    usage = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                usage[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": usage.get("Rss", 0),
+        "pss": usage.get("Pss", 0),
+        "private": usage.get("Private_Clean", 0) + usage.get("Private_Dirty", 0),
+    }
+
+
+BENCHMARK_PROMPT = (
+    "Can you please help me write a short summary of the quarterly sales "
+    "report, focusing on the regions where revenue declined and the main "
+    "reasons given by the regional managers for the decline?"
+)
+
+# Set in the measuring process before forking in shared mode
+_shared_optimizer = None
+
+
+def _worker(connection, backend: str) -> None:
+    optimizer = _shared_optimizer
+    if optimizer is None:
+        from services.aiOptimise import PromptOptimizer
+        optimizer = PromptOptimizer(backend)
+    # Serve one request of each kind so inference buffers are allocated
+    optimizer.summarize_prompt(BENCHMARK_PROMPT)
+    optimizer.extract_keywords(BENCHMARK_PROMPT)
+    connection.send("ready")
+    connection.recv()
+
+
+def measure(workers: int, shared: bool, backend: str = "pytorch") -> Dict:
+    """
+    Start `workers` forked workers and measure their memory once warm.
+
+    Args:
+        workers: Number of worker processes
+        shared: Load the models before forking (True) or in every worker
+        backend: Inference backend to load
+
+    Returns:
+        Per-worker and total memory figures in MiB
+    """
+    global _shared_optimizer
+    if shared:
+        from services.aiOptimise import PromptOptimizer
+        _shared_optimizer = PromptOptimizer(backend)
+        gc.collect()
+        gc.freeze()
+
+    context = multiprocessing.get_context("fork")
+    processes, connections = [], []
+    for _ in range(workers):
+        parent_end, child_end = context.Pipe()
+        process = context.Process(target=_worker, args=(child_end, backend))
+        process.start()
+        processes.append(process)
+        connections.append(parent_end)
+    for connection in connections:
+        connection.recv()
+
+    usages = [memory_usage(process.pid) for process in processes]
+    master = memory_usage(os.getpid())
+    for connection in connections:
+        connection.send("exit")
+    for process in processes:
+        process.join()
+
+    def mib(kib):
+        return round(kib / 1024, 1)
+
+    return {
+        "mode": "shared" if shared else "per-worker",
+        "workers": workers,
+        "rss_per_worker": mib(sum(u["rss"] for u in usages) / workers),
+        "pss_per_worker": mib(sum(u["pss"] for u in usages) / workers),
+        "private_per_worker": mib(sum(u["private"] for u in usages) / workers),
+        # Pss sums to the real footprint; the master holds its own share
+        "total_pss": mib(sum(u["pss"] for u in usages) + master["pss"]),
+    }
+
+
+def benchmark(worker_counts: List[int], backend: str = "pytorch") -> None:
+    """Compare per-worker memory of both modes as the worker count grows."""
+    print(f"{'mode':>10} {'workers':>7} {'rss/w MB':>9} {'pss/w MB':>9} "
+          f"{'priv/w MB':>9} {'total MB':>9}")
+    spawn = multiprocessing.get_context("spawn")
+    for shared in (False, True):
+        for workers in worker_counts:
+            # A fresh process per run keeps model state from leaking between runs
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                result = pool.submit(measure, workers, shared, backend).result()
+            print(f"{result['mode']:>10} {result['workers']:>7} "
+                  f"{result['rss_per_worker']:>9} {result['pss_per_worker']:>9} "
+                  f"{result['private_per_worker']:>9} {result['total_pss']:>9}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure per-worker memory with and without shared model weights.")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--backend", default=os.environ.get("AI_INFERENCE_BACKEND", "pytorch"))
+    args = parser.parse_args(argv)
+
+    benchmark(args.workers, args.backend)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
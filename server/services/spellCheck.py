@@ -1,32 +1,104 @@
 from spellchecker import SpellChecker
+import multiprocessing
+import os
 import re
-from typing import List, Optional, Dict
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Dict, Iterable, FrozenSet, Tuple
 from dto.spell_check_dto import (
     SpellCheckResponse, SpellCheckData, MisspelledWord, 
     BatchSpellCheckResponse, SpellCheckSummary
 )
 
 
+# Suggestion workers for large batches; each process builds its own checker
+_worker_service = None
+
+# Started from a clean server process rather than forked from a threaded
+# request handler, whose locks may be held mid-fork
+_SUGGESTION_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+
+def _init_suggestion_worker(language: str, max_suggestions: int, backend: str,
+                            added_words: Tuple[str, ...] = ()):
+    global _worker_service
+    _worker_service = SpellCheckService(language=language,
+                                        max_suggestions=max_suggestions,
+                                        backend=backend, strict=True)
+    # Replay words added to the parent's dictionary so both paths agree
+    if added_words:
+        _worker_service.add_words_to_dictionary(list(added_words))
+
+
+def _suggest_chunk(words: List[str]) -> Dict[str, List[str]]:
+    return {word: _worker_service._get_suggestions(word) for word in words}
+
+
 class SpellCheckService:
     """
     A service class to handle spell checking operations with various configurations.
     """
 
-    def __init__(self, language: str = "en", max_suggestions: int = 5):
+    BACKENDS = ("pyspellchecker", "symspell")
+
+    def __init__(self, language: str = "en", max_suggestions: int = 5,
+                 backend: str = "pyspellchecker", strict: bool = False):
         """
         Initialize the spell checker service.
 
         Args:
             language: Language code for spell checking (default: "en")
             max_suggestions: Maximum number of suggestions per misspelled word (default: 5)
+            backend: "pyspellchecker" or "symspell" (precomputed deletion index)
+            strict: Raise if the language can't be loaded instead of falling
+                back to English (for services cached per language)
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown spell check backend: {backend}")
         self.language = language
         self.max_suggestions = max_suggestions
+        self.backend = backend
+        # Batches with at least this many unique misspellings use the pool
+        self.parallel_min_words = int(os.environ.get("SPELL_CHECK_PARALLEL_MIN_WORDS", "64"))
+        self.max_workers = int(os.environ.get("SPELL_CHECK_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+        self.pool = None
+        self.pool_lock = threading.Lock()
+        self.closed = False
+        # Words added at runtime, replayed into new suggestion workers
+        self.added_words: List[str] = []
+        # Suggestions per word (LRU), shared by all requests and filled by
+        # the worker pool too; cleared whenever the dictionary changes
+        self.suggestion_cache_size = int(os.environ.get("SPELL_CHECK_SUGGESTION_CACHE_SIZE", "20000"))
+        self.suggestion_cache = OrderedDict()
+        self.suggestion_cache_lock = threading.Lock()
+        # Bumped on every clear, so results computed against an older
+        # dictionary are never stored
+        self.suggestion_generation = 0
         try:
-            self.spell_checker = SpellChecker(language=language)
+            self.spell_checker = self._create_checker(language)
         except Exception as e:
+            if strict:
+                raise
             print(f"Warning: Could not initialize spell checker for language {language}, using default")
-            self.spell_checker = SpellChecker()
+            self.spell_checker = self._create_checker("en")
+
+    def _create_checker(self, language: str):
+        """
+        Build the checker for the configured backend.
+
+        Args:
+            language: Language code to load
+
+        Returns:
+            SpellChecker or SymSpellChecker
+        """
+        if self.backend == "symspell":
+            from services.symspell import SymSpellChecker
+            return SymSpellChecker(language=language)
+        return SpellChecker(language=language)
 
     def _extract_words(self, text: str) -> List[tuple]:
         """
@@ -46,6 +118,49 @@ class SpellCheckService:
             words_with_positions.append((word, position))
         return words_with_positions
 
+    @staticmethod
+    def _remove_diacritics(word: str) -> str:
+        return ''.join(c for c in unicodedata.normalize('NFKD', word)
+                       if not unicodedata.combining(c))
+
+    def _compute_word_suggestions(self, word: str) -> tuple:
+        """
+        Compute suggestions for a word from a single candidate generation.
+
+        Mirrors SpellChecker.correction (most frequent candidate, preferring
+        ones that only differ by diacritics) without generating the
+        edit-distance candidates a second time.
+
+        Args:
+            word: The misspelled word
+
+        Returns:
+            Tuple of suggested corrections, best first
+        """
+        candidates = self.spell_checker.candidates(word)
+        if not candidates:
+            return ()
+
+        frequency = self.spell_checker.word_usage_frequency
+        word_no_accents = self._remove_diacritics(word)
+        diacritics_candidates = [c for c in candidates
+                                 if self._remove_diacritics(c) == word_no_accents]
+        best_correction = max(diacritics_candidates or candidates, key=frequency)
+
+        suggestions = []
+        if best_correction != word:
+            suggestions.append(best_correction)
+
+        # Other candidates, most frequent first, excluding the best correction
+        other_candidates = sorted(
+            (c for c in candidates if c != best_correction and c != word),
+            key=lambda c: (-frequency(c), c))
+        # Limit to max_suggestions total
+        remaining_slots = self.max_suggestions - len(suggestions)
+        suggestions.extend(other_candidates[:remaining_slots])
+
+        return tuple(suggestions)
+
     def _get_suggestions(self, word: str) -> List[str]:
         """
         Get spelling suggestions for a misspelled word.
@@ -56,30 +171,161 @@ class SpellCheckService:
         Returns:
             List of suggested corrections
         """
-        suggestions = []
-        
-        # Get the best correction first
-        best_correction = self.spell_checker.correction(word)
-        if best_correction and best_correction != word:
-            suggestions.append(best_correction)
-        
-        # Get other candidates
-        candidates = self.spell_checker.candidates(word)
-        if candidates:
-            # Add other candidates, excluding the best correction to avoid duplicates
-            other_candidates = [c for c in candidates if c != best_correction and c != word]
-            # Limit to max_suggestions total
-            remaining_slots = self.max_suggestions - len(suggestions)
-            suggestions.extend(other_candidates[:remaining_slots])
-        
+        return list(self._cached_suggestions(word))
+
+    def _cached_suggestions(self, word: str) -> tuple:
+        with self.suggestion_cache_lock:
+            suggestions = self.suggestion_cache.get(word)
+            if suggestions is not None:
+                self.suggestion_cache.move_to_end(word)
+                return suggestions
+            generation = self.suggestion_generation
+        suggestions = self._compute_word_suggestions(word)
+        self._store_suggestions({word: suggestions}, generation)
         return suggestions
 
-    def check_spelling(self, text: str) -> SpellCheckResponse:
+    def _store_suggestions(self, suggestions: Dict[str, tuple], generation: int) -> None:
+        with self.suggestion_cache_lock:
+            if generation != self.suggestion_generation:
+                return
+            for word, word_suggestions in suggestions.items():
+                self.suggestion_cache[word] = word_suggestions
+                self.suggestion_cache.move_to_end(word)
+            while len(self.suggestion_cache) > self.suggestion_cache_size:
+                self.suggestion_cache.popitem(last=False)
+
+    def _clear_suggestion_cache(self) -> None:
+        with self.suggestion_cache_lock:
+            self.suggestion_cache.clear()
+            self.suggestion_generation += 1
+
+    def _compute_suggestions(self, words: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Compute suggestions once per unique word, in parallel for large sets.
+
+        Cached words are answered from the LRU; only the rest go to the
+        worker pool, and its results are stored in the LRU.
+
+        Args:
+            words: Unique misspelled words
+
+        Returns:
+            Dict mapping each word to its suggestions
+        """
+        words = list(words)
+        suggestions = {}
+        with self.suggestion_cache_lock:
+            generation = self.suggestion_generation
+            for word in words:
+                cached = self.suggestion_cache.get(word)
+                if cached is not None:
+                    self.suggestion_cache.move_to_end(word)
+                    suggestions[word] = list(cached)
+        words = sorted(word for word in words if word not in suggestions)
+        if len(words) < self.parallel_min_words or self.max_workers <= 1:
+            suggestions.update((word, self._get_suggestions(word)) for word in words)
+            return suggestions
+
+        chunk_size = -(-len(words) // self.max_workers)
+        chunks = [words[i:i + chunk_size] for i in range(0, len(words), chunk_size)]
+        # Submit under the lock so close() can't shut the pool down between
+        # the lookup and the submission
+        with self.pool_lock:
+            if self.closed:
+                results = None
+            else:
+                if self.pool is None:
+                    self.pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=_SUGGESTION_MP_CONTEXT,
+                        initializer=_init_suggestion_worker,
+                        initargs=(self.language, self.max_suggestions, self.backend,
+                                  tuple(self.added_words)))
+                results = self.pool.map(_suggest_chunk, chunks)
+        if results is None:
+            # Closed (e.g. evicted from the language pool) while still in use
+            suggestions.update((word, self._get_suggestions(word)) for word in words)
+            return suggestions
+
+        computed = {}
+        for chunk_suggestions in results:
+            computed.update(chunk_suggestions)
+        self._store_suggestions(
+            {word: tuple(word_suggestions) for word, word_suggestions in computed.items()},
+            generation)
+        suggestions.update(computed)
+        return suggestions
+
+    def _overlay_suggestions(self, word: str, base_suggestions: List[str],
+                             custom_words: FrozenSet[str]) -> List[str]:
+        """
+        Merge close custom words into the base dictionary's suggestions.
+
+        Args:
+            word: The misspelled word
+            base_suggestions: Suggestions from the shared dictionary
+            custom_words: Tenant or request specific words
+
+        Returns:
+            Suggestions with custom words within edit distance 2 first
+        """
+        from services.symspell import bounded_distance
+
+        distances = {}
+        for custom_word in custom_words:
+            distance = bounded_distance(word, custom_word)
+            if distance <= 2:
+                distances[custom_word] = distance
+        custom_suggestions = sorted(distances, key=lambda w: (distances[w], w))
+        merged = list(dict.fromkeys(custom_suggestions + base_suggestions))
+        return merged[:self.max_suggestions]
+
+    def find_misspelled(self, words_with_positions: List[tuple],
+                        suggestions: Optional[Dict[str, List[str]]] = None,
+                        custom_words: Optional[FrozenSet[str]] = None) -> List[MisspelledWord]:
+        """
+        Find misspelled words among already extracted words.
+
+        Args:
+            words_with_positions: (word, position) tuples from _extract_words
+            suggestions: Precomputed suggestions per word (optional)
+            custom_words: Extra accepted words for this call (optional)
+
+        Returns:
+            List of misspelled words with suggestions, in text order
+        """
+        misspelled_set = self.spell_checker.unknown(
+            [word for word, _ in words_with_positions])
+        if custom_words:
+            misspelled_set -= custom_words
+
+        misspelled_words = []
+        for word, position in words_with_positions:
+            if word in misspelled_set:
+                if suggestions is not None and word in suggestions:
+                    word_suggestions = suggestions[word]
+                else:
+                    word_suggestions = self._get_suggestions(word)
+                if custom_words:
+                    word_suggestions = self._overlay_suggestions(
+                        word, word_suggestions, custom_words)
+                misspelled_words.append(MisspelledWord(
+                    misspelled_word=word,
+                    suggestions=word_suggestions,
+                    position=position
+                ))
+        return misspelled_words
+
+    def check_spelling(self, text: str, suggestions: Optional[Dict[str, List[str]]] = None,
+                       custom_words: Optional[FrozenSet[str]] = None) -> SpellCheckResponse:
         """
         Check spelling for a single text.
 
         Args:
             text: The text to check for spelling errors
+            suggestions: Precomputed suggestions per word (optional)
+            custom_words: Extra accepted words layered over the shared
+                dictionary for this call only (optional)
 
         Returns:
             SpellCheckResponse: Complete spell check results
@@ -103,25 +349,12 @@ class SpellCheckService:
                     data=None
                 )
             
-            # Get just the words for spell checking
-            words = [word for word, _ in words_with_positions]
-            
-            # Find misspelled words
-            misspelled_set = self.spell_checker.unknown(words)
-            
-            # Build detailed results
-            misspelled_words = []
-            for word, position in words_with_positions:
-                if word in misspelled_set:
-                    suggestions = self._get_suggestions(word)
-                    misspelled_words.append(MisspelledWord(
-                        misspelled_word=word,
-                        suggestions=suggestions,
-                        position=position
-                    ))
+            # Find misspelled words and build detailed results
+            misspelled_words = self.find_misspelled(
+                words_with_positions, suggestions, custom_words)
             
             # Calculate accuracy
-            total_words = len(words)
+            total_words = len(words_with_positions)
             misspelled_count = len(misspelled_words)
             accuracy = ((total_words - misspelled_count) / total_words * 100) if total_words > 0 else 0
             
@@ -149,12 +382,14 @@ class SpellCheckService:
                 data=None
             )
 
-    def batch_check_spelling(self, texts: List[str]) -> BatchSpellCheckResponse:
+    def batch_check_spelling(self, texts: List[str],
+                             custom_words: Optional[FrozenSet[str]] = None) -> BatchSpellCheckResponse:
         """
         Check spelling for multiple texts.
 
         Args:
             texts: List of texts to check for spelling errors
+            custom_words: Extra accepted words for this batch (optional)
 
         Returns:
             BatchSpellCheckResponse: Results for all texts with summary statistics
@@ -168,13 +403,22 @@ class SpellCheckService:
                     summary=None
                 )
             
+            # Deduplicate misspellings across the whole batch so each unique
+            # word gets its suggestions computed exactly once
+            unique_words = set()
+            for text in texts:
+                if text and isinstance(text, str):
+                    unique_words.update(word for word, _ in self._extract_words(text))
+            suggestions = self._compute_suggestions(
+                self.spell_checker.unknown(unique_words) - (custom_words or frozenset()))
+
             results = []
             total_words = 0
             total_misspelled = 0
             successful_checks = 0
             
             for text in texts:
-                result = self.check_spelling(text)
+                result = self.check_spelling(text, suggestions, custom_words)
                 results.append(result)
                 
                 if result.status == "success" and result.data:
@@ -237,11 +481,35 @@ class SpellCheckService:
             for word in words:
                 if word and isinstance(word, str):
                     self.spell_checker.word_frequency.load_words([word.lower()])
+                    self.added_words.append(word.lower())
+            self._clear_suggestion_cache()
+            self._reset_pool()
             return True
         except Exception as e:
             print(f"Error adding words to dictionary: {e}")
             return False
 
+    def _reset_pool(self) -> None:
+        # Workers hold a copy of the dictionary; the next parallel batch
+        # starts fresh ones that include the current words
+        with self.pool_lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=False, cancel_futures=False)
+                self.pool = None
+
+    def close(self) -> None:
+        """
+        Release the suggestion worker pool, if one was started.
+
+        Work already submitted still completes, so requests holding this
+        service keep working; later batches compute suggestions serially.
+        """
+        with self.pool_lock:
+            self.closed = True
+            if self.pool is not None:
+                self.pool.shutdown(wait=False, cancel_futures=False)
+                self.pool = None
+
     def set_language(self, language: str) -> bool:
         """
         Change the language for spell checking.
@@ -253,8 +521,11 @@ class SpellCheckService:
             bool: True if successful, False otherwise
         """
         try:
-            self.spell_checker = SpellChecker(language=language)
+            self.spell_checker = self._create_checker(language)
             self.language = language
+            self.added_words = []
+            self._clear_suggestion_cache()
+            self._reset_pool()
             return True
         except Exception as e:
             print(f"Error setting language to {language}: {e}")
@@ -0,0 +1,191 @@
+import bisect
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import FrozenSet, List, Optional, Tuple
+from dto.spell_check_dto import MisspelledWord
+from services.spellCheck import SpellCheckService
+
+_WORD_CHAR = re.compile(r'\w')
+
+
+@dataclass
+class DocumentState:
+    """Spell check state kept for one open document."""
+    text: str
+    language: str
+    total_words: int
+    # Sorted by position
+    misspelled: List[MisspelledWord] = field(default_factory=list)
+    version: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class SpellCheckSessionStore:
+    """
+    Bounded store of per-document spell check state for incremental checks.
+
+    Only the words touched by an edit are re-checked. Misspellings after the
+    edit keep their suggestions and are shifted by the length delta, so the
+    cost of an edit depends on the size of the edit, not of the document.
+
+    Document ids are issued by the store and are unguessable, so clients
+    can't collide with or read each other's documents. State is local to
+    the worker process; an edit for a document it doesn't know must be
+    answered by resending the full text (or routed with sticky sessions).
+    """
+
+    def __init__(self, max_documents: int = 10000, idle_ttl: int = 1800,
+                 max_text_length: int = 100000):
+        """
+        Initialize the store.
+
+        Args:
+            max_documents: Maximum number of open documents (LRU eviction)
+            idle_ttl: Seconds after which an idle document is dropped
+            max_text_length: Largest document accepted
+        """
+        self.max_documents = max_documents
+        self.idle_ttl = idle_ttl
+        self.max_text_length = max_text_length
+        self.documents = OrderedDict()
+        self.lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, document_id: str) -> Optional[DocumentState]:
+        with self.lock:
+            self._evict_idle()
+            state = self.documents.get(document_id)
+            if state is not None:
+                state.last_used = time.monotonic()
+                self.documents.move_to_end(document_id)
+            return state
+
+    def open(self, text: str, language: str, service: SpellCheckService,
+             custom_words: Optional[FrozenSet[str]] = None,
+             document_id: Optional[str] = None) -> Tuple[str, DocumentState]:
+        """
+        Check a full text and start (or restart) its session.
+
+        Args:
+            text: Full document text
+            language: Dictionary language used for the document
+            service: Spell check service for that language
+            custom_words: Extra accepted words (optional)
+            document_id: Id of an open document to resync; a new id is
+                issued if it is omitted or unknown to this store
+
+        Returns:
+            Tuple of (document id, new document state)
+        """
+        if len(text) > self.max_text_length:
+            raise ValueError(f"Document exceeds {self.max_text_length} characters")
+        words_with_positions = service._extract_words(text)
+        state = DocumentState(
+            text=text,
+            language=language,
+            total_words=len(words_with_positions),
+            misspelled=service.find_misspelled(
+                words_with_positions, custom_words=custom_words),
+        )
+        with self.lock:
+            if document_id is None or document_id not in self.documents:
+                document_id = secrets.token_urlsafe(16)
+            self.documents[document_id] = state
+            self.documents.move_to_end(document_id)
+            while len(self.documents) > self.max_documents:
+                self.documents.popitem(last=False)
+                self.evictions += 1
+        return document_id, state
+
+    @staticmethod
+    def _expand_to_words(text: str, start: int, end: int) -> Tuple[int, int]:
+        # Widen the range so no word is cut in half
+        while start > 0 and _WORD_CHAR.match(text[start - 1]):
+            start -= 1
+        while end < len(text) and _WORD_CHAR.match(text[end]):
+            end += 1
+        return start, end
+
+    def apply_edit(self, state: DocumentState, start: int, end: int,
+                   replacement: str, service: SpellCheckService,
+                   custom_words: Optional[FrozenSet[str]] = None
+                   ) -> Tuple[List[MisspelledWord], List[MisspelledWord], int, int]:
+        """
+        Replace text[start:end] and re-check only the affected words.
+
+        Args:
+            state: The document to edit
+            start: Start offset of the replaced range
+            end: End offset of the replaced range
+            replacement: Text inserted in place of the range
+            service: Spell check service for the document's language
+            custom_words: Extra accepted words (optional)
+
+        Returns:
+            Tuple of (removed entries with old positions, added entries with
+            new positions, old offset from which positions shift, delta)
+
+        Raises:
+            ValueError: If the range is outside the document
+        """
+        with state.lock:
+            text = state.text
+            if not 0 <= start <= end <= len(text):
+                raise ValueError("Edit range is outside the document")
+            delta = len(replacement) - (end - start)
+            if len(text) + delta > self.max_text_length:
+                raise ValueError(f"Document exceeds {self.max_text_length} characters")
+
+            old_start, old_end = self._expand_to_words(text, start, end)
+            new_text = text[:start] + replacement + text[end:]
+            new_start, new_end = self._expand_to_words(
+                new_text, old_start, old_end + delta)
+            # The text outside the window is unchanged, so the same window in
+            # old coordinates is also word aligned
+            old_window_end = new_end - delta
+
+            old_words = service._extract_words(text[new_start:old_window_end])
+            new_words = [(word, position + new_start) for word, position
+                         in service._extract_words(new_text[new_start:new_end])]
+            added = service.find_misspelled(new_words, custom_words=custom_words)
+
+            positions = [m.position for m in state.misspelled]
+            first = bisect.bisect_left(positions, new_start)
+            last = bisect.bisect_left(positions, old_window_end)
+            removed = state.misspelled[first:last]
+            shifted = [
+                m.model_copy(update={"position": m.position + delta})
+                for m in state.misspelled[last:]
+            ] if delta else state.misspelled[last:]
+
+            state.misspelled = state.misspelled[:first] + added + shifted
+            state.total_words += len(new_words) - len(old_words)
+            state.text = new_text
+            state.version += 1
+            return removed, added, old_window_end, delta
+
+    def close(self, document_id: str) -> bool:
+        with self.lock:
+            return self.documents.pop(document_id, None) is not None
+
+    def _evict_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_ttl
+        while self.documents:
+            document_id, state = next(iter(self.documents.items()))
+            if state.last_used >= cutoff:
+                break
+            self.documents.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "documents": len(self.documents),
+                "max_documents": self.max_documents,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,153 @@
+import asyncio
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from spellchecker import SpellChecker
+from services.spellCheck import SpellCheckService
+
+
+class SpellCheckerPool:
+    """
+    Language-keyed pool of spell check services.
+
+    Dictionaries load lazily on a background thread the first time a
+    language is requested; concurrent requests for the same language share
+    one load. Resident dictionaries are capped by count and approximate
+    memory, and the least recently used language is evicted first.
+    """
+
+    def __init__(self, factory: Callable[[str], SpellCheckService],
+                 max_languages: int = 3, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize the pool.
+
+        Args:
+            factory: Builds a SpellCheckService for a language code
+            max_languages: Maximum number of resident dictionaries
+            max_bytes: Approximate memory budget for resident dictionaries
+        """
+        self.factory = factory
+        self.max_languages = max(1, max_languages)
+        self.max_bytes = max_bytes
+        self.supported_languages = set(SpellChecker.languages())
+        # language -> {"service", "bytes", "loaded_at", "last_used"}
+        self.resident = OrderedDict()
+        self.loading: Dict[str, Future] = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="dictionary-loader")
+        self.load_times_ms: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def get_future(self, language: str) -> Future:
+        """
+        Return a future resolving to the service for a language, starting a
+        background load if the dictionary is not resident.
+
+        Raises:
+            ValueError: If the language has no bundled dictionary
+        """
+        if language not in self.supported_languages:
+            raise ValueError(f"Unsupported language: {language}")
+        with self.lock:
+            entry = self.resident.get(language)
+            if entry is not None:
+                self.hits += 1
+                entry["last_used"] = time.time()
+                self.resident.move_to_end(language)
+                future = Future()
+                future.set_result(entry["service"])
+                return future
+            self.misses += 1
+            future = self.loading.get(language)
+            if future is None:
+                future = self.executor.submit(self._load, language)
+                self.loading[language] = future
+            return future
+
+    def get(self, language: str, timeout: Optional[float] = None) -> SpellCheckService:
+        """Blocking lookup, for use from worker threads."""
+        return self.get_future(language).result(timeout)
+
+    async def get_async(self, language: str) -> SpellCheckService:
+        """Lookup that waits for a load without blocking the event loop."""
+        return await asyncio.wrap_future(self.get_future(language))
+
+    @staticmethod
+    def _estimate_bytes(service: SpellCheckService) -> int:
+        checker = service.spell_checker
+        words = getattr(checker.word_frequency, "dictionary", None)
+        if words is None:
+            words = getattr(checker, "word_ids", {})
+        # Key strings plus one int per entry, on top of the dict itself
+        return sys.getsizeof(words) + sum(sys.getsizeof(word) + 28 for word in words)
+
+    def _load(self, language: str) -> SpellCheckService:
+        start = time.perf_counter()
+        try:
+            service = self.factory(language)
+            size = self._estimate_bytes(service)
+        except Exception:
+            with self.lock:
+                self.loading.pop(language, None)
+            raise
+        load_ms = (time.perf_counter() - start) * 1000
+
+        with self.lock:
+            now = time.time()
+            self.resident[language] = {
+                "service": service, "bytes": size,
+                "loaded_at": now, "last_used": now,
+            }
+            self.resident.move_to_end(language)
+            self.loading.pop(language, None)
+            self.load_times_ms[language] = round(load_ms, 1)
+            self.loads += 1
+            self._evict(keep=language)
+        return service
+
+    def _evict(self, keep: str) -> None:
+        # In-flight requests keep their reference; close() lets their
+        # submitted suggestion work finish instead of cancelling it
+        while len(self.resident) > 1 and (
+                len(self.resident) > self.max_languages
+                or sum(e["bytes"] for e in self.resident.values()) > self.max_bytes):
+            language = next(iter(self.resident))
+            if language == keep:
+                break
+            self.resident.pop(language)["service"].close()
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "resident": {
+                    language: {
+                        "bytes": entry["bytes"],
+                        "loaded_at": entry["loaded_at"],
+                        "last_used": entry["last_used"],
+                        "load_time_ms": self.load_times_ms.get(language),
+                    }
+                    for language, entry in self.resident.items()
+                },
+                "loading": sorted(self.loading),
+                "resident_bytes": sum(e["bytes"] for e in self.resident.values()),
+                "max_languages": self.max_languages,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        with self.lock:
+            for entry in self.resident.values():
+                entry["service"].close()
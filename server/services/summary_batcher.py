@@ -0,0 +1,165 @@
+import os
+import queue
+import threading
+import time
+import weakref
+from collections import defaultdict
+from concurrent.futures import Future, InvalidStateError
+from typing import Callable, List, Tuple
+
+
+class SummaryQueueFull(Exception):
+    """Raised when too many summarization requests are already waiting."""
+
+
+# Batchers of this process; reset in forked children (see _after_fork)
+_batchers = weakref.WeakSet()
+
+
+def _after_fork() -> None:
+    # Threads and held locks do not survive fork(); the child restarts the
+    # scheduler lazily on its first submit, so pool workers that never
+    # summarize never start one
+    for batcher in list(_batchers):
+        batcher._reset()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+class SummaryBatcher:
+    """
+    Coalesces concurrent summarization calls into padded pipeline batches.
+
+    Callers block in `summarize` while a single scheduler thread collects
+    requests for up to `max_wait_ms` (or until `max_batch_size` arrive),
+    groups them by generation parameters and runs one pipeline call per
+    group. Each caller receives only its own summary text.
+
+    Async callers use `submit` and await the returned future, so waiting
+    for a batch to fill holds no thread; at most `max_pending` requests
+    may wait at once.
+    """
+
+    def __init__(self, summarizer: Callable, max_batch_size: int = 8,
+                 max_wait_ms: float = 10, max_pending: int = 64):
+        """
+        Initialize the batcher; the scheduler thread starts on first use.
+
+        Args:
+            summarizer: Hugging Face summarization pipeline
+            max_batch_size: Maximum number of texts sent in one pipeline call
+            max_wait_ms: Maximum time to wait for a batch to fill up
+            max_pending: Maximum number of queued or running requests
+        """
+        self.summarizer = summarizer
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.max_pending = max_pending
+        self._reset()
+        _batchers.add(self)
+
+    def _reset(self) -> None:
+        self.requests = queue.Queue()
+        self.pending = 0
+        self.pending_lock = threading.Lock()
+        self.thread = None
+
+    def _ensure_started(self) -> None:
+        # Called with pending_lock held
+        if self.thread is None:
+            self.thread = threading.Thread(
+                target=self._run, name="summary-batcher", daemon=True)
+            self.thread.start()
+
+    def summarize(self, text: str, max_length: int, min_length: int) -> str:
+        """
+        Summarize a text as part of the next batch.
+
+        Args:
+            text: The text to summarize
+            max_length: Maximum length of the summary
+            min_length: Minimum length of the summary
+
+        Returns:
+            The summary text
+        """
+        return self.submit(text, max_length, min_length).result()
+
+    def submit(self, text: str, max_length: int, min_length: int) -> Future:
+        """
+        Queue a text for the next batch without waiting for it.
+
+        Returns:
+            A future resolving to the summary text
+
+        Raises:
+            SummaryQueueFull: If max_pending requests are already waiting
+        """
+        with self.pending_lock:
+            if self.pending >= self.max_pending:
+                raise SummaryQueueFull(
+                    f"{self.pending} summarization requests already pending")
+            self.pending += 1
+            self._ensure_started()
+        future = Future()
+        future.add_done_callback(self._release)
+        self.requests.put((text, max_length, min_length, future))
+        return future
+
+    def _release(self, _future: Future) -> None:
+        with self.pending_lock:
+            self.pending -= 1
+
+    def _collect(self) -> List[Tuple]:
+        batch = [self.requests.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._run_batch(self._collect())
+            except Exception as e:
+                # Never let one bad batch stop the scheduler
+                print(f"Summary batch failed: {e}")
+
+    def _run_batch(self, batch: List[Tuple]) -> None:
+        groups = defaultdict(list)
+        for text, max_length, min_length, future in batch:
+            # Drops requests whose caller gave up (e.g. the client went
+            # away); the others can no longer be cancelled
+            if future.set_running_or_notify_cancel():
+                groups[(max_length, min_length)].append((text, future))
+
+        for (max_length, min_length), items in groups.items():
+            texts = [text for text, _ in items]
+            try:
+                summaries = self.summarizer(
+                    texts, max_length=max_length, min_length=min_length,
+                    do_sample=False, batch_size=len(texts)
+                )
+            except Exception as e:
+                for _, future in items:
+                    _settle(future, exception=e)
+                continue
+            for (_, future), summary in zip(items, summaries):
+                _settle(future, result=summary['summary_text'])
+
+
+def _settle(future: Future, result=None, exception: Exception = None) -> None:
+    try:
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
@@ -0,0 +1,357 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import string
+import tempfile
+import time
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+import numpy as np
+
+# Directory holding one precomputed index per language
+SYMSPELL_INDEX_DIR = os.environ.get(
+    "SYMSPELL_INDEX_DIR",
+    str(Path(__file__).resolve().parent.parent / "spell_index")
+)
+
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 7
+
+
+def _hash(text: str) -> int:
+    # Stable across processes, unlike the builtin hash()
+    return int.from_bytes(
+        hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(),
+        "little")
+
+
+def _deletes(word: str, max_distance: int = MAX_DISTANCE) -> Dict[str, int]:
+    """All strings obtained by deleting up to max_distance characters,
+    mapped to the number of deletions needed."""
+    deletes = {word: 0}
+    frontier = {word}
+    for depth in range(1, max_distance + 1):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        for delete in frontier:
+            deletes.setdefault(delete, depth)
+    return deletes
+
+
+def _trim_affixes(a: str, b: str):
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while (end < len(a) - start and end < len(b) - start
+           and a[-1 - end] == b[-1 - end]):
+        end += 1
+    return a[start:len(a) - end], b[start:len(b) - end]
+
+
+def bounded_distance(a: str, b: str, max_distance: int = MAX_DISTANCE) -> int:
+    """
+    Damerau-Levenshtein distance, or max_distance + 1 if it is larger.
+
+    Shared prefixes and suffixes are trimmed and a character-bag lower bound
+    rejects most far-away words before the quadratic computation runs.
+    """
+    a, b = _trim_affixes(a, b)
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    extra_a, extra_b = Counter(a), Counter(b)
+    extra_a.subtract(b)
+    extra_b.subtract(a)
+    bag_distance = max(sum(n for n in extra_a.values() if n > 0),
+                       sum(n for n in extra_b.values() if n > 0))
+    if bag_distance > max_distance:
+        return max_distance + 1
+    return min(damerau_levenshtein(a, b), max_distance + 1)
+
+
+def damerau_levenshtein(a: str, b: str) -> int:
+    """
+    Unrestricted Damerau-Levenshtein distance (Lowrance-Wagner).
+
+    This is the number of chained single edits pyspellchecker applies when
+    it builds its edit-distance-1 and edit-distance-2 candidate sets.
+    """
+    inf = len(a) + len(b)
+    last_row = {}
+    d = [[inf] * (len(b) + 2)]
+    d += [[inf] + list(range(len(b) + 1))]
+    for i in range(1, len(a) + 1):
+        d.append([inf, i] + [0] * len(b))
+        last_match_col = 0
+        for j in range(1, len(b) + 1):
+            k = last_row.get(b[j - 1], 0)
+            l = last_match_col
+            cost = 1
+            if a[i - 1] == b[j - 1]:
+                cost = 0
+                last_match_col = j
+            d[i + 1][j + 1] = min(
+                d[i][j] + cost,
+                d[i + 1][j] + 1,
+                d[i][j + 1] + 1,
+                d[k][l] + (i - k - 1) + 1 + (j - l - 1),
+            )
+        last_row[a[i - 1]] = i
+    return d[len(a) + 1][len(b) + 1]
+
+
+class SymSpellChecker:
+    """
+    Symmetric-delete spell checker backed by a precomputed, memory-mapped index.
+
+    Every dictionary word is indexed under the deletes of its prefix, so a
+    lookup only hashes the deletes of the query and binary-searches them,
+    instead of generating O(26·n²) edit-distance-2 strings. It exposes the
+    subset of the pyspellchecker.SpellChecker API that SpellCheckService
+    uses, with the same candidate semantics.
+    """
+
+    def __init__(self, language: str = "en", index_dir: str = SYMSPELL_INDEX_DIR):
+        """
+        Load the prebuilt index for a language.
+
+        Indexes are never built here: several workers starting at once
+        would race to write the same files. Build them once beforehand
+        with `python -m services.symspell build --language <code>`.
+
+        Args:
+            language: Language code of the pyspellchecker dictionary
+            index_dir: Directory holding the precomputed indexes
+
+        Raises:
+            FileNotFoundError: If the language has no built index
+        """
+        path = Path(index_dir) / language
+        if not (path / "meta.json").exists():
+            raise FileNotFoundError(
+                f"No SymSpell index for '{language}' in {index_dir}; build it with "
+                f"`python -m services.symspell build --language {language}`")
+
+        with open(path / "meta.json") as f:
+            meta = json.load(f)
+        self.language = language
+        self.prefix_length = meta["prefix_length"]
+        self.longest_word_length = meta["longest_word_length"]
+        self.words = (path / "words.txt").read_text(encoding="utf-8").split("\n")
+        self.word_ids = {word: i for i, word in enumerate(self.words)}
+        self.frequencies = np.load(path / "frequencies.npy", mmap_mode="r")
+        self.total_words = int(meta["total_words"])
+        self.delete_hashes = np.load(path / "delete_hashes.npy", mmap_mode="r")
+        self.delete_word_ids = np.load(path / "delete_word_ids.npy", mmap_mode="r")
+        self.delete_depths = np.load(path / "delete_depths.npy", mmap_mode="r")
+
+        # Words added at runtime live in a small in-memory overlay
+        self.extra_words: Dict[str, int] = {}
+        self.extra_deletes: Dict[str, Set[tuple]] = {}
+
+    @property
+    def word_frequency(self) -> "SymSpellChecker":
+        # SpellCheckService adds words via spell_checker.word_frequency.load_words
+        return self
+
+    def load_words(self, words: Iterable[str]) -> None:
+        for word in words:
+            word = word.lower()
+            self.extra_words[word] = self.extra_words.get(word, 0) + 1
+            for delete, depth in _deletes(word[:self.prefix_length]).items():
+                self.extra_deletes.setdefault(delete, set()).add((word, depth))
+            self.longest_word_length = max(self.longest_word_length, len(word))
+
+    def _frequency(self, word: str) -> int:
+        word_id = self.word_ids.get(word)
+        base = int(self.frequencies[word_id]) if word_id is not None else 0
+        return base + self.extra_words.get(word, 0)
+
+    def word_usage_frequency(self, word: str) -> float:
+        return self._frequency(word) / self.total_words
+
+    def _is_word(self, word: str) -> bool:
+        return word in self.word_ids or word in self.extra_words
+
+    def _should_check(self, word: str) -> bool:
+        # Same rules as SpellChecker._check_if_should_check
+        if len(word) == 1 and word in string.punctuation:
+            return False
+        if len(word) > self.longest_word_length + 3:
+            return False
+        if word.lower() in ("nan", "inf", "infinity"):
+            return True
+        try:
+            float(word)
+            return False
+        except ValueError:
+            return True
+
+    def known(self, words: Iterable[str]) -> Set[str]:
+        return {w.lower() for w in words
+                if self._is_word(w.lower()) and self._should_check(w.lower())}
+
+    def unknown(self, words: Iterable[str]) -> Set[str]:
+        return {w.lower() for w in words
+                if self._should_check(w) and not self._is_word(w.lower())}
+
+    def candidates(self, word: str) -> Optional[Set[str]]:
+        """
+        Known words closest to the word, at edit distance 1 if any exist,
+        otherwise at edit distance 2, like SpellChecker.candidates.
+        """
+        word = word.lower()
+        if self._is_word(word) or not self._should_check(word):
+            return {word}
+
+        deletes = _deletes(word[:self.prefix_length])
+        keys = list(deletes)
+        hashes = np.fromiter((_hash(d) for d in keys), dtype=np.uint64,
+                             count=len(keys))
+        starts = np.searchsorted(self.delete_hashes, hashes, side="left")
+        ends = np.searchsorted(self.delete_hashes, hashes, side="right")
+
+        # Words at distance 1 share a string reachable with at most one
+        # deletion on each side, so try those entries first and only fall
+        # back to the full distance-2 neighbourhood when none qualifies.
+        for max_depth in (1, MAX_DISTANCE):
+            suggestions = set()
+            for key, start, end in zip(keys, starts, ends):
+                if deletes[key] > max_depth:
+                    continue
+                if end > start:
+                    depths = self.delete_depths[start:end]
+                    ids = self.delete_word_ids[start:end][depths <= max_depth]
+                    suggestions.update(self.words[i] for i in ids)
+                suggestions.update(
+                    extra for extra, depth in self.extra_deletes.get(key, ())
+                    if depth <= max_depth)
+
+            found = {s for s in suggestions
+                     if bounded_distance(word, s, max_depth) <= max_depth}
+            if found:
+                return found
+        return None
+
+
+def build_index(language: str = "en", index_dir: str = SYMSPELL_INDEX_DIR) -> Path:
+    """
+    Precompute the symmetric-delete index from pyspellchecker's dictionary.
+
+    The index is written to a temporary directory and moved into place
+    with a rename, so readers never see a partially written index.
+
+    Args:
+        language: Language code of the pyspellchecker dictionary
+        index_dir: Directory to write the index into
+
+    Returns:
+        Path of the written index
+    """
+    from spellchecker import SpellChecker
+
+    word_frequency = SpellChecker(language=language).word_frequency
+    words = sorted(word_frequency.dictionary)
+    path = Path(index_dir) / language
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Same filesystem as the target, so the final rename is atomic
+    build_path = Path(tempfile.mkdtemp(prefix=f".{language}-", dir=path.parent))
+
+    try:
+        delete_hashes = array("Q")
+        delete_word_ids = array("I")
+        delete_depths = array("B")
+        for word_id, word in enumerate(words):
+            for delete, depth in _deletes(word[:PREFIX_LENGTH]).items():
+                delete_hashes.append(_hash(delete))
+                delete_word_ids.append(word_id)
+                delete_depths.append(depth)
+
+        hashes = np.frombuffer(delete_hashes, dtype=np.uint64)
+        order = np.argsort(hashes, kind="stable")
+        np.save(build_path / "delete_hashes.npy", hashes[order])
+        np.save(build_path / "delete_word_ids.npy",
+                np.frombuffer(delete_word_ids, dtype=np.uint32)[order])
+        np.save(build_path / "delete_depths.npy",
+                np.frombuffer(delete_depths, dtype=np.uint8)[order])
+        np.save(build_path / "frequencies.npy",
+                np.array([word_frequency.dictionary[w] for w in words], dtype=np.int64))
+        (build_path / "words.txt").write_text("\n".join(words), encoding="utf-8")
+        with open(build_path / "meta.json", "w") as f:
+            json.dump({
+                "language": language,
+                "prefix_length": PREFIX_LENGTH,
+                "max_distance": MAX_DISTANCE,
+                "longest_word_length": word_frequency.longest_word_length,
+                "total_words": word_frequency.total_words,
+            }, f)
+    except BaseException:
+        shutil.rmtree(build_path, ignore_errors=True)
+        raise
+    build_path.chmod(0o755)
+
+    # A directory can't be renamed over a non-empty one, so move any old
+    # index aside first; open memory maps of it stay valid
+    previous = None
+    if path.exists():
+        previous = Path(tempfile.mkdtemp(prefix=f".{language}-old-", dir=path.parent))
+        os.replace(path, previous / language)
+    os.replace(build_path, path)
+    if previous is not None:
+        shutil.rmtree(previous, ignore_errors=True)
+    return path
+
+
+BENCHMARK_WORDS = [
+    "tset", "speling", "misteaks", "thiss", "recieve", "definately",
+    "seperate", "occurence", "accomodate", "goverment", "enviroment",
+    "optimze", "promt", "effciency", "sustainabilty", "algoritm",
+    "comprehensve", "recomendation", "transfomer", "interationalization",
+]
+
+
+def benchmark(language: str = "en", rounds: int = 3) -> None:
+    """Compare suggestion latency and agreement of both backends."""
+    from services.spellCheck import SpellCheckService
+
+    for backend in ("pyspellchecker", "symspell"):
+        start = time.perf_counter()
+        service = SpellCheckService(language=language, backend=backend)
+        load_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for word in BENCHMARK_WORDS:
+                service._compute_word_suggestions(word)
+        per_word_ms = (time.perf_counter() - start) * 1000 / (rounds * len(BENCHMARK_WORDS))
+        print(f"{backend:>15}: load {load_ms:8.1f} ms, {per_word_ms:8.3f} ms/word")
+
+    reference = SpellCheckService(language=language, backend="pyspellchecker")
+    symspell = SpellCheckService(language=language, backend="symspell")
+    agree = sum(reference._compute_word_suggestions(w) == symspell._compute_word_suggestions(w)
+                for w in BENCHMARK_WORDS)
+    print(f"identical suggestions: {agree}/{len(BENCHMARK_WORDS)}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Build or benchmark the SymSpell spell-check index.")
+    parser.add_argument("command", choices=["build", "benchmark"])
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--dir", default=SYMSPELL_INDEX_DIR,
+                        help=f"Index directory (default: {SYMSPELL_INDEX_DIR})")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        path = build_index(args.language, args.dir)
+        print(f"Index written to {path} in {time.perf_counter() - start:.1f}s")
+    else:
+        benchmark(args.language)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,314 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+# Directory holding the persisted tenant dictionaries
+TENANT_DICTIONARY_DIR = os.environ.get(
+    "TENANT_DICTIONARY_DIR",
+    str(Path(__file__).resolve().parent.parent / "data" / "tenant_dictionaries")
+)
+
+
+class FileTenantWordBackend:
+    """
+    Persists each tenant's words as a JSON file.
+
+    Every worker on the host reads the same files. Updates take an
+    exclusive file lock and replace the file atomically, so concurrent
+    writers from different workers never lose each other's words.
+    """
+
+    def __init__(self, directory: str = TENANT_DICTIONARY_DIR):
+        """
+        Initialize the backend.
+
+        Args:
+            directory: Directory for the dictionary files (created if missing)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        # One lock file for the directory, so removing a tenant leaves nothing behind
+        self.lock_path = self.directory / ".lock"
+
+    @contextmanager
+    def _locked(self):
+        with self.lock, open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _path(self, tenant_id: str) -> Path:
+        # Tenant ids come from URLs, so never use them as file names directly
+        digest = hashlib.sha256(tenant_id.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def version(self, tenant_id: str) -> Optional[Tuple[int, int]]:
+        """Cheap change marker for a tenant's words (None if it has none)."""
+        try:
+            stat = os.stat(self._path(tenant_id))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def load(self, tenant_id: str) -> FrozenSet[str]:
+        try:
+            with open(self._path(tenant_id), encoding="utf-8") as f:
+                return frozenset(json.load(f)["words"])
+        except FileNotFoundError:
+            return frozenset()
+
+    def add(self, tenant_id: str, words: FrozenSet[str], max_words: int) -> FrozenSet[str]:
+        path = self._path(tenant_id)
+        with self._locked():
+            updated = self.load(tenant_id) | words
+            if len(updated) > max_words:
+                raise ValueError(f"Tenant dictionary limited to {max_words} words")
+            tmp = str(path) + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"tenant_id": tenant_id, "words": sorted(updated)}, f)
+            os.replace(tmp, path)
+            return updated
+
+    def remove(self, tenant_id: str) -> bool:
+        with self._locked():
+            try:
+                os.remove(self._path(tenant_id))
+                return True
+            except FileNotFoundError:
+                return False
+
+
+class RedisTenantWordBackend:
+    """
+    Keeps each tenant's words in a Redis set shared by every worker and host.
+
+    Requires the optional `redis` package.
+    """
+
+    def __init__(self, url: str, prefix: str = "promptgreen:dictionary:"):
+        """
+        Connect to Redis.
+
+        Args:
+            url: Redis connection URL, e.g. redis://localhost:6379/0
+            prefix: Key prefix so the dictionaries can share a database
+        """
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "TENANT_DICTIONARY_URL is set but the 'redis' package is not installed") from e
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def version(self, tenant_id: str) -> Optional[int]:
+        raw = self.client.get(self.prefix + "version:" + tenant_id)
+        return int(raw) if raw is not None else None
+
+    def load(self, tenant_id: str) -> FrozenSet[str]:
+        return frozenset(word.decode("utf-8") for word in
+                         self.client.smembers(self.prefix + "words:" + tenant_id))
+
+    def add(self, tenant_id: str, words: FrozenSet[str], max_words: int) -> FrozenSet[str]:
+        updated = self.load(tenant_id) | words
+        if len(updated) > max_words:
+            raise ValueError(f"Tenant dictionary limited to {max_words} words")
+        if words:
+            pipe = self.client.pipeline()
+            pipe.sadd(self.prefix + "words:" + tenant_id, *words)
+            pipe.incr(self.prefix + "version:" + tenant_id)
+            pipe.execute()
+        return updated
+
+    def remove(self, tenant_id: str) -> bool:
+        # The version only ever grows, so a worker that cached an older
+        # version can never mistake a re-created dictionary for its copy
+        pipe = self.client.pipeline()
+        pipe.delete(self.prefix + "words:" + tenant_id)
+        pipe.incr(self.prefix + "version:" + tenant_id)
+        deleted, _ = pipe.execute()
+        return bool(deleted)
+
+
+class TenantDictionaryStore:
+    """
+    Per-tenant custom word sets layered over the shared base dictionary.
+
+    The words live in a persistent backend shared by all workers; this store
+    keeps an in-memory overlay of recently used tenants. Each overlay is an
+    immutable frozenset, so in-flight checks keep the snapshot they started
+    with (copy-on-write). The backend is re-checked at most every
+    `refresh_interval` seconds, so words added through another worker show
+    up quickly. Idle tenants are dropped from memory after `idle_ttl`
+    seconds and the least recently used overlays are dropped when the
+    accounted memory exceeds `max_bytes`; either way they are reloaded from
+    the backend on next use.
+    """
+
+    def __init__(self, backend=None, max_bytes: int = 64 * 1024 * 1024,
+                 idle_ttl: int = 3600, max_words_per_tenant: int = 10000,
+                 refresh_interval: float = 2.0):
+        """
+        Initialize the store.
+
+        Args:
+            backend: FileTenantWordBackend or RedisTenantWordBackend
+                (default: files in TENANT_DICTIONARY_DIR)
+            max_bytes: Memory budget for the in-memory overlays
+            idle_ttl: Seconds after which an unused overlay is dropped
+            max_words_per_tenant: Upper bound on one tenant's word set
+            refresh_interval: Minimum seconds between backend change checks
+        """
+        self.backend = backend or FileTenantWordBackend()
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.max_words_per_tenant = max_words_per_tenant
+        self.refresh_interval = refresh_interval
+        # tenant_id -> (words, accounted bytes, last used, backend version, next check)
+        self.tenants = OrderedDict()
+        self.total_bytes = 0
+        self.evictions = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "TenantDictionaryStore":
+        """Build the store from TENANT_DICTIONARY_* environment variables."""
+        url = os.environ.get("TENANT_DICTIONARY_URL")
+        backend = RedisTenantWordBackend(url) if url else FileTenantWordBackend()
+        return cls(
+            backend,
+            max_bytes=int(os.environ.get("TENANT_DICTIONARY_MAX_BYTES", str(64 * 1024 * 1024))),
+            idle_ttl=int(os.environ.get("TENANT_DICTIONARY_IDLE_TTL", "3600")),
+            refresh_interval=float(os.environ.get("TENANT_DICTIONARY_REFRESH_INTERVAL", "2")))
+
+    @staticmethod
+    def _size_of(words: FrozenSet[str]) -> int:
+        return sys.getsizeof(words) + sum(sys.getsizeof(word) for word in words)
+
+    @staticmethod
+    def normalize(words: Iterable[str]) -> FrozenSet[str]:
+        return frozenset(word.strip().lower() for word in words
+                         if isinstance(word, str) and word.strip())
+
+    def get(self, tenant_id: str) -> FrozenSet[str]:
+        """
+        Return the tenant's current word set snapshot.
+
+        Args:
+            tenant_id: Tenant identifier
+
+        Returns:
+            Frozen set of custom words (empty if the tenant is unknown)
+        """
+        now = time.monotonic()
+        with self.lock:
+            self._evict_idle()
+            entry = self.tenants.get(tenant_id)
+            if entry is not None:
+                words, size, _, version, next_check = entry
+                self.tenants[tenant_id] = (words, size, now, version, next_check)
+                self.tenants.move_to_end(tenant_id)
+                if now < next_check:
+                    return words
+
+        # Backend I/O happens outside the lock
+        try:
+            current = self.backend.version(tenant_id)
+            if entry is not None and current == entry[3]:
+                words = entry[0]
+            else:
+                words = self.backend.load(tenant_id)
+        except Exception as e:
+            # A broken backend must never fail the check itself
+            print(f"Tenant dictionary lookup failed: {e}")
+            self.errors += 1
+            return entry[0] if entry is not None else frozenset()
+
+        with self.lock:
+            self._install(tenant_id, words, current)
+        return words
+
+    def add_words(self, tenant_id: str, words: Iterable[str]) -> FrozenSet[str]:
+        """
+        Add words to a tenant's dictionary and persist them.
+
+        Args:
+            tenant_id: Tenant identifier
+            words: Words to add
+
+        Returns:
+            The tenant's new word set
+
+        Raises:
+            ValueError: If the tenant would exceed max_words_per_tenant
+        """
+        updated = self.backend.add(
+            tenant_id, self.normalize(words), self.max_words_per_tenant)
+        version = self.backend.version(tenant_id)
+        with self.lock:
+            self._evict_idle()
+            self._install(tenant_id, updated, version)
+        return updated
+
+    def remove_tenant(self, tenant_id: str) -> bool:
+        removed = self.backend.remove(tenant_id)
+        with self.lock:
+            entry = self.tenants.pop(tenant_id, None)
+            if entry is not None:
+                self.total_bytes -= entry[1]
+        return removed
+
+    def _install(self, tenant_id: str, words: FrozenSet[str], version: Any) -> None:
+        now = time.monotonic()
+        previous = self.tenants.get(tenant_id)
+        size = self._size_of(words)
+        self.tenants[tenant_id] = (words, size, now, version, now + self.refresh_interval)
+        self.tenants.move_to_end(tenant_id)
+        self.total_bytes += size - (previous[1] if previous is not None else 0)
+        self._evict_over_budget(keep=tenant_id)
+
+    def _evict_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_ttl
+        # Entries are kept in least-recently-used order
+        while self.tenants:
+            tenant_id, entry = next(iter(self.tenants.items()))
+            if entry[2] >= cutoff:
+                break
+            self.tenants.popitem(last=False)
+            self.total_bytes -= entry[1]
+            self.evictions += 1
+
+    def _evict_over_budget(self, keep: Optional[str] = None) -> None:
+        while self.total_bytes > self.max_bytes and len(self.tenants) > 1:
+            tenant_id = next(iter(self.tenants))
+            if tenant_id == keep:
+                break
+            entry = self.tenants.pop(tenant_id)
+            self.total_bytes -= entry[1]
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "backend": type(self.backend).__name__,
+                "tenants": len(self.tenants),
+                "words": sum(len(entry[0]) for entry in self.tenants.values()),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "errors": self.errors,
+            }